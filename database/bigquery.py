@@ -1,3 +1,4 @@
+from database.metadata_cache import MetadataCache
 from database.orm.tables import Tables
 from utilities.configuration import Configuration
 from utilities.configuration import ConfigurationBigQuery
@@ -12,10 +13,11 @@ from google.cloud.bigquery.dataset import DatasetReference
 from google.cloud.bigquery.query import ScalarQueryParameter
 from google.cloud.bigquery.schema import SchemaField
 from google.cloud.bigquery.table import Table, TableReference
-from google.cloud.bigquery.job import QueryJob
-from google.cloud.exceptions import BadRequest
+from google.cloud.bigquery.job import LoadJobConfig, QueryJob, WriteDisposition
+from google.cloud.exceptions import BadRequest, Conflict, NotFound
 from google.oauth2 import service_account
 from datetime import datetime
+from time import monotonic
 from typing import Sequence
 
 
@@ -31,7 +33,15 @@ class DatasetDoesNotExistError(Error):
 
 
 class BigQuery:
-    def __init__(self, configuration: Configuration):
+    DEFAULT_INSERT_BATCH_SIZE = 5000
+    DEFAULT_INSERT_FLUSH_INTERVAL = 60
+
+    def __init__(
+            self,
+            configuration: Configuration,
+            insert_batch_size: int = DEFAULT_INSERT_BATCH_SIZE,
+            insert_flush_interval: int = DEFAULT_INSERT_FLUSH_INTERVAL
+    ):
         if type(configuration.databases.bigquery) is not ConfigurationBigQuery:
             raise ConfigurationMissingError('No bigquery connection configured')
 
@@ -41,6 +51,14 @@ class BigQuery:
         self._additional_datasets = {}
         self._connected = False
         self._insert_batch = {}
+        self._insert_batch_size = max(1, insert_batch_size)
+        self._insert_flush_interval = insert_flush_interval
+        self._last_commit = monotonic()
+        self._tables = {}
+        self._metadata_cache = MetadataCache(
+            configuration.databases.bigquery.metadata_cache_ttl,
+            configuration.databases.bigquery.metadata_cache_redis
+        )
 
     def __enter__(self):
         self.connect()
@@ -79,8 +97,12 @@ class BigQuery:
         self._connected = True
 
     def close(self):
-        self._client.close()
-        self._connected = False
+        try:
+            if self._connected is True:
+                self.commit()
+        finally:
+            self._client.close()
+            self._connected = False
 
     def is_connected(self):
         return self._connected
@@ -103,8 +125,6 @@ class BigQuery:
         ).table(table_name)
 
     def has_table(self, table_name, dataset_name=None) -> bool:
-        has_table = False
-
         if dataset_name is None or dataset_name == self._dataset.dataset_id:
             dataset = self._dataset
         else:
@@ -113,28 +133,55 @@ class BigQuery:
 
             dataset = self._additional_datasets[dataset_name]
 
-        for table_listitem in self._client.list_tables(dataset):
-            if table_listitem.table_id == table_name:
-                has_table = True
-                break
+        return self._lookup_table(dataset.project + '.' + dataset.dataset_id + '.' + table_name) is not None
 
-        return has_table
+    def _lookup_dataset(self, dataset_configuration: ConfigurationBigQueryDataset):
+        dataset_id = dataset_configuration.project + '.' + dataset_configuration.name
+        cached_dataset = self._metadata_cache.get('dataset:' + dataset_id)
 
-    def _has_dataset(self, dataset_configuration: ConfigurationBigQueryDataset) -> bool:
-        has_dataset = False
+        if cached_dataset is not None:
+            return Dataset.from_api_repr(cached_dataset)
+
+        try:
+            dataset = self._client.get_dataset(dataset_id)
+        except NotFound:
+            return None
+
+        self._metadata_cache.set('dataset:' + dataset_id, dataset.to_api_repr())
+
+        return dataset
+
+    def _lookup_table(self, table_id: str):
+        if table_id in self._tables:
+            return self._tables[table_id]
+
+        cached_table = self._metadata_cache.get('table:' + table_id)
+
+        if cached_table is not None:
+            self._tables[table_id] = Table.from_api_repr(cached_table)
+
+            return self._tables[table_id]
+
+        try:
+            table = self._client.get_table(table_id)
+        except NotFound:
+            return None
 
-        for dataset_listitem in self._client.list_datasets(dataset_configuration.project):
-            if dataset_listitem.dataset_id == dataset_configuration.name:
-                has_dataset = True
-                break
+        self._metadata_cache.set('table:' + table_id, table.to_api_repr())
+        self._tables[table_id] = table
 
-        return has_dataset
+        return table
+
+    def _has_dataset(self, dataset_configuration: ConfigurationBigQueryDataset) -> bool:
+        return self._lookup_dataset(dataset_configuration) is not None
 
     def _get_dataset(self, dataset_configuration: ConfigurationBigQueryDataset) -> Dataset:
-        if not self._has_dataset(dataset_configuration):
+        dataset = self._lookup_dataset(dataset_configuration)
+
+        if dataset is None:
             raise TableDoesNotExistError('The dataset "' + dataset_configuration.name + '" does not exist')
 
-        return self._client.get_dataset(dataset_configuration.name)
+        return dataset
 
     def _create_dataset(self, dataset_configuration: ConfigurationBigQueryDataset) -> Dataset:
         dataset = bigquery.Dataset(dataset_configuration.project + '.' + dataset_configuration.name)
@@ -142,17 +189,17 @@ class BigQuery:
         dataset.description = dataset_configuration.description
         dataset.labels = dataset_configuration.labels
 
-        return self._client.create_dataset(dataset)
+        try:
+            dataset = self._client.create_dataset(dataset)
+        except Conflict:
+            return self._get_dataset(dataset_configuration)
 
-    def _has_table(self, table_name) -> bool:
-        has_table = False
+        self._metadata_cache.set('dataset:' + dataset.project + '.' + dataset.dataset_id, dataset.to_api_repr())
 
-        for table_listitem in self._client.list_tables(self._dataset):
-            if table_listitem.table_id == table_name:
-                has_table = True
-                break
+        return dataset
 
-        return has_table
+    def _has_table(self, table_name) -> bool:
+        return self.has_table(table_name)
 
     def _get_table(self, table_name, dataset_name: str = None) -> Table:
         if dataset_name is not None:
@@ -163,22 +210,32 @@ class BigQuery:
         else:
             dataset = self._dataset
 
-        if not self._has_table(table_name):
-            raise TableDoesNotExistError('The table "' + table_name + '" does not exist')
+        table = self._lookup_table(dataset.project + '.' + dataset.dataset_id + '.' + table_name)
 
-        table_id = dataset.project + '.' + dataset.dataset_id + '.' + table_name
+        if table is None:
+            raise TableDoesNotExistError('The table "' + table_name + '" does not exist')
 
-        return self._client.get_table(table_id)
+        return table
 
     def _create_table(self, name: str, schema: Sequence[SchemaField]) -> Table:
-        return self._client.create_table(bigquery.Table(name, schema))
+        try:
+            table = self._client.create_table(bigquery.Table(name, schema))
+        except Conflict:
+            table = self._client.get_table(name)
+
+        self._metadata_cache.set('table:' + name, table.to_api_repr())
+        self._tables[name] = table
+
+        return table
 
     def init_check_table(self, urlset: str) -> Table:
         table_name = Tables.checks_tablename(urlset)
         table_id = self._dataset.project + '.' + self._dataset.dataset_id + '.' + table_name
 
-        if self._has_table(table_name):
-            return self._get_table(table_name)
+        table = self._lookup_table(table_id)
+
+        if table is not None:
+            return table
 
         return self._create_table(
             table_id,
@@ -204,9 +261,30 @@ class BigQuery:
 
         self._insert_batch[table_name].append(data)
 
+        if len(self._insert_batch[table_name]) >= self._insert_batch_size or \
+                monotonic() - self._last_commit >= self._insert_flush_interval:
+            self.commit()
+
     def commit(self):
-        for table_name, data in self._insert_batch.items():
-            self._client.insert_rows(self._get_table(table_name), data)
+        self._last_commit = monotonic()
+
+        for table_name in list(self._insert_batch):
+            data = self._insert_batch[table_name]
+
+            if 0 < len(data):
+                table = self._get_table(table_name)
+                job_config = LoadJobConfig()
+                job_config.write_disposition = WriteDisposition.WRITE_APPEND
+                job_config.schema = table.schema
+
+                load_job = self._client.load_table_from_json(data, table, job_config=job_config)
+                load_job.result()
+
+            # the rows of a failed load job stay buffered for the next commit
+            self._insert_batch[table_name] = self._insert_batch[table_name][len(data):]
+
+            if 0 == len(self._insert_batch[table_name]):
+                del self._insert_batch[table_name]
 
     def add_check(
             self,
@@ -224,7 +302,7 @@ class BigQuery:
         self._insert_data_batch(
             Tables.checks_tablename(urlset),
             {
-                'created': datetime.utcnow(),
+                'created': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'),
                 'check': check,
                 'diff': diff,
                 'error': error,
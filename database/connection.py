@@ -6,15 +6,54 @@ from utilities.configuration import ConfigurationMongoDB
 from utilities.configuration import ConfigurationORM
 from utilities.configuration import ConfigurationBigQuery
 from utilities.exceptions import NoConnectionError
+from threading import Lock
+from typing import Callable
+import atexit
+
+
+class ConnectionPool:
+    _instances = {}
+    _lock = Lock()
+    _registered = False
+
+    @staticmethod
+    def get(configuration_hash: str, backend: str, factory: Callable):
+        key = (configuration_hash, backend)
+
+        with ConnectionPool._lock:
+            if not ConnectionPool._registered:
+                atexit.register(ConnectionPool.close)
+                ConnectionPool._registered = True
+
+            instance = ConnectionPool._instances.get(key)
+
+            if instance is None or not instance.is_connected():
+                instance = factory()
+                ConnectionPool._instances[key] = instance
+
+            return instance
+
+    @staticmethod
+    def close():
+        with ConnectionPool._lock:
+            instances, ConnectionPool._instances = ConnectionPool._instances, {}
+
+        for instance in instances.values():
+            instance.close()
 
 
 class Connection:
-    def __init__(self, configuration: Configuration):
+    # the orm engines are shared by the EngineRegistry, their connections are checked out per task instead
+    POOLED_BACKENDS = ['mongodb', 'bigquery']
+
+    def __init__(self, configuration: Configuration, pooled: bool = False):
         self._mongodb_configuration = None
         self._orm_configuration = None
         self._bigquery_configuration = None
         self._configuration = configuration
-        self._instances = []
+        self._pooled = pooled
+        self._instances = {}
+        self._close_callbacks = []
 
         if type(configuration.databases.mongodb) is ConfigurationMongoDB:
             self._mongodb_configuration = configuration.databases.mongodb
@@ -31,9 +70,30 @@ class Connection:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
+    def register_close_callback(self, callback: Callable):
+        self._close_callbacks.append(callback)
+
     def close(self):
-        for instance in self._instances:
-            instance.close()
+        callbacks, self._close_callbacks = self._close_callbacks, []
+        instances, self._instances = self._instances, {}
+
+        for callback in callbacks:
+            callback()
+
+        for backend, instance in instances.items():
+            if not self._pooled or backend not in Connection.POOLED_BACKENDS:
+                instance.close()
+            elif type(instance) is BigQuery:
+                instance.commit()
+
+    def _instance(self, backend: str, factory: Callable):
+        if backend not in self._instances:
+            if self._pooled and backend in Connection.POOLED_BACKENDS:
+                self._instances[backend] = ConnectionPool.get(self._configuration.hash, backend, factory)
+            else:
+                self._instances[backend] = factory()
+
+        return self._instances[backend]
 
     def has_mongodb(self) -> bool:
         return type(self._mongodb_configuration) is ConfigurationMongoDB
@@ -43,11 +103,12 @@ class Connection:
         if not self.has_mongodb():
             raise NoConnectionError('No MongoDB configuration')
 
+        return self._instance('mongodb', self._create_mongodb)
+
+    def _create_mongodb(self) -> MongoDB:
         mongodb = MongoDB(self._mongodb_configuration)
         mongodb.connect()
 
-        self._instances.append(mongodb)
-
         return mongodb
 
     def has_orm(self) -> bool:
@@ -58,11 +119,12 @@ class Connection:
         if not self.has_orm():
             raise NoConnectionError('No ORM configuration')
 
+        return self._instance('orm', self._create_orm)
+
+    def _create_orm(self) -> ORM:
         orm = ORM(self._configuration)
         orm.connect()
 
-        self._instances.append(orm)
-
         return orm
 
     def has_bigquery(self) -> bool:
@@ -73,9 +135,10 @@ class Connection:
         if not self.has_bigquery():
             raise NoConnectionError('No BigQuery configuration')
 
+        return self._instance('bigquery', self._create_bigquery)
+
+    def _create_bigquery(self) -> BigQuery:
         bigquery = BigQuery(self._configuration)
         bigquery.connect()
 
-        self._instances.append(bigquery)
-
         return bigquery
@@ -0,0 +1,105 @@
+from pymongo.errors import OperationFailure
+from importlib import import_module
+from typing import Sequence
+import pkgutil
+
+
+class MongoDBIndex:
+    def __init__(
+            self,
+            collection_name: str,
+            keys: Sequence[tuple],
+            name: str,
+            unique: bool = False,
+            expire_after_seconds: int = None
+    ):
+        self.collection_name = collection_name
+        self.keys = list(keys)
+        self.name = name
+        self.unique = unique
+        self.expire_after_seconds = expire_after_seconds
+
+    def options(self) -> dict:
+        options = {'name': self.name}
+
+        if self.unique:
+            options['unique'] = True
+
+        if self.expire_after_seconds is not None:
+            options['expireAfterSeconds'] = self.expire_after_seconds
+
+        return options
+
+
+class IndexRegistry:
+    MODULE_PACKAGES = ['modules.aggregation.custom', 'modules.operation.custom']
+    INDEX_OPTIONS_CONFLICT_CODES = [85, 86]
+
+    _indexes = {}
+
+    @staticmethod
+    def register(
+            collection_name: str,
+            keys: Sequence[tuple],
+            name: str,
+            unique: bool = False,
+            expire_after_seconds: int = None
+    ):
+        IndexRegistry._indexes[(collection_name, name)] = MongoDBIndex(
+            collection_name,
+            keys,
+            name,
+            unique,
+            expire_after_seconds
+        )
+
+    @staticmethod
+    def indexes() -> Sequence[MongoDBIndex]:
+        return list(IndexRegistry._indexes.values())
+
+    @staticmethod
+    def load_modules():
+        for package_name in IndexRegistry.MODULE_PACKAGES:
+            package = import_module(package_name)
+
+            for module_info in pkgutil.iter_modules(package.__path__):
+                try:
+                    import_module(package_name + '.' + module_info.name)
+                except ImportError as error:
+                    print('Could not load indexes of module "' + module_info.name + '": ' + str(error))
+
+    @staticmethod
+    def apply(mongodb):
+        for index in IndexRegistry.indexes():
+            IndexRegistry.apply_index(mongodb, index)
+
+    @staticmethod
+    def apply_index(mongodb, index: MongoDBIndex):
+        collection = mongodb.get_collection(index.collection_name)
+
+        try:
+            collection.create_index(index.keys, **index.options())
+        except OperationFailure as error:
+            if error.code not in IndexRegistry.INDEX_OPTIONS_CONFLICT_CODES:
+                raise
+
+            existing_indexes = collection.index_information()
+
+            if index.name in existing_indexes and index.expire_after_seconds is not None and \
+                    1 == len(index.keys) and _normalize_keys(existing_indexes[index.name]['key']) == index.keys:
+                mongodb.get_database().command(
+                    'collMod',
+                    index.collection_name,
+                    index={'name': index.name, 'expireAfterSeconds': index.expire_after_seconds}
+                )
+                return
+
+            for existing_name, existing_index in existing_indexes.items():
+                if existing_name == index.name or _normalize_keys(existing_index['key']) == index.keys:
+                    collection.drop_index(existing_name)
+
+            collection.create_index(index.keys, **index.options())
+
+
+def _normalize_keys(keys: Sequence[tuple]) -> list:
+    return [(key, int(direction) if type(direction) is float else direction) for key, direction in keys]
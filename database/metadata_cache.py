@@ -0,0 +1,68 @@
+from redis import Redis
+from redis.exceptions import RedisError
+from threading import Lock
+from time import monotonic
+import json
+
+
+class MetadataCache:
+    KEY_PREFIX = 'dawis:metadata:'
+
+    _entries = {}
+    _lock = Lock()
+
+    def __init__(self, ttl: int, redis_url: str = None):
+        self._ttl = ttl
+        self._redis = Redis.from_url(redis_url) if redis_url is not None else None
+
+    def get(self, key: str):
+        if 0 >= self._ttl:
+            return None
+
+        with MetadataCache._lock:
+            if key in MetadataCache._entries:
+                expires, value = MetadataCache._entries[key]
+
+                if expires > monotonic():
+                    return value
+
+                del MetadataCache._entries[key]
+
+        if self._redis is not None:
+            try:
+                value = self._redis.get(MetadataCache.KEY_PREFIX + key)
+            except RedisError:
+                return None
+
+            if value is not None:
+                value = json.loads(value)
+
+                with MetadataCache._lock:
+                    MetadataCache._entries[key] = (monotonic() + self._ttl, value)
+
+                return value
+
+        return None
+
+    def set(self, key: str, value: dict):
+        if 0 >= self._ttl:
+            return
+
+        with MetadataCache._lock:
+            MetadataCache._entries[key] = (monotonic() + self._ttl, value)
+
+        if self._redis is not None:
+            try:
+                self._redis.set(MetadataCache.KEY_PREFIX + key, json.dumps(value), ex=self._ttl)
+            except RedisError:
+                pass
+
+    def delete(self, key: str):
+        with MetadataCache._lock:
+            MetadataCache._entries.pop(key, None)
+
+        if self._redis is not None:
+            try:
+                self._redis.delete(MetadataCache.KEY_PREFIX + key)
+            except RedisError:
+                pass
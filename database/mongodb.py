@@ -1,13 +1,15 @@
 from utilities.configuration import ConfigurationMongoDB
 from utilities.url import URL
 from utilities.exceptions import ExitError
+from database.index_registry import IndexRegistry
 from pymongo import MongoClient
 from pymongo.database import Database
 from pymongo.collection import Collection
 from pymongo.errors import ServerSelectionTimeoutError
 from bson.objectid import ObjectId
 from urllib.parse import quote_plus
-from typing import Sequence
+from time import monotonic
+from typing import Callable, Iterator, Sequence
 
 
 class CollectionDoesNotExist(Exception):
@@ -16,11 +18,15 @@ class CollectionDoesNotExist(Exception):
 
 class MongoDB:
     COLLECTION_NAME_CONFIGURATION = 'configuration'
+    COLLECTION_NAMES_REFRESH_INTERVAL = 5
+    DEFAULT_BATCH_SIZE = 1000
 
     def __init__(self, configuration: ConfigurationMongoDB):
         self._configuration = configuration
         self._database = None
         self._connected = False
+        self._collection_names = None
+        self._collection_names_loaded = 0
 
         connection_url = 'mongodb://'
 
@@ -75,19 +81,82 @@ class MongoDB:
         if not auto_create and not self.has_collection(collection_name):
             raise CollectionDoesNotExist
 
+        # raw writes on the returned collection create it implicitly, without passing the cache
+        if auto_create:
+            self._collection_created(collection_name)
+
         return self._database.get_collection(collection_name)
 
     def has_collection(self, collection_name: str) -> bool:
-        return collection_name in self._database.list_collection_names()
+        if self._collection_names is not None and collection_name in self._collection_names:
+            return True
+
+        if self._collection_names is None or \
+                monotonic() - self._collection_names_loaded >= self.COLLECTION_NAMES_REFRESH_INTERVAL:
+            self._collection_names = set(self._database.list_collection_names())
+            self._collection_names_loaded = monotonic()
+
+        return collection_name in self._collection_names
+
+    def _collection_created(self, collection_name: str):
+        if self._collection_names is not None:
+            self._collection_names.add(collection_name)
 
-    def insert_documents(self, collection_name: str, data: Sequence[dict], auto_create: bool = True):
-        self.get_collection(collection_name, auto_create).insert_many(data)
+    def _collection_dropped(self, collection_name: str):
+        if self._collection_names is not None:
+            self._collection_names.discard(collection_name)
+
+    def drop_collection(self, collection_name: str):
+        self._database.drop_collection(collection_name)
+        self._collection_dropped(collection_name)
+
+    def rename_collection(self, collection_name: str, new_collection_name: str):
+        self.get_collection(collection_name, False).rename(new_collection_name)
+        self._collection_dropped(collection_name)
+        self._collection_created(new_collection_name)
+
+    def insert_documents(
+            self,
+            collection_name: str,
+            data: Sequence[dict],
+            auto_create: bool = True,
+            ordered: bool = True
+    ):
+        self.get_collection(collection_name, auto_create).insert_many(data, ordered=ordered)
+        self._collection_created(collection_name)
 
     def insert_document(self, collection_name: str, data: dict, auto_create: bool = True):
         self.get_collection(collection_name, auto_create).insert_one(data)
+        self._collection_created(collection_name)
 
     def update_one(self, collection_name: str, document_id: ObjectId, update_data: dict):
-        self.get_collection(collection_name, False).find_one_and_update({'_id': document_id}, {'$set': update_data})
+        self.get_collection(collection_name, False).update_one({'_id': document_id}, {'$set': update_data})
+
+    def update_many_by_ids(
+            self,
+            collection_name: str,
+            document_ids: Sequence[ObjectId],
+            update_data: dict,
+            chunk_size: int = DEFAULT_BATCH_SIZE
+    ):
+        collection = self.get_collection(collection_name, False)
+        document_ids = list(document_ids)
+        chunk_size = max(1, chunk_size)
+
+        for offset in range(0, len(document_ids), chunk_size):
+            collection.update_many(
+                {'_id': {'$in': document_ids[offset:offset + chunk_size]}},
+                {'$set': update_data}
+            )
+
+    def acknowledger(
+            self,
+            collection_name: str,
+            update_data: dict,
+            chunk_size: int = DEFAULT_BATCH_SIZE,
+            before_flush: Callable = None
+    ):
+        return BulkAcknowledger(self, collection_name, update_data, chunk_size, before_flush)
 
     def delete_one(self, collection_name: str, document_id: ObjectId):
         self.get_collection(collection_name, False).delete_one({'_id': document_id})
@@ -117,6 +186,52 @@ class MongoDB:
 
         return [self._init_url(document) for document in result]
 
+    def iter_pages(
+            self,
+            collection_name: str,
+            filter_parameter: dict,
+            projection: dict = None,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            hydrate_url: bool = True
+    ) -> Iterator[list]:
+        collection = self.get_collection(collection_name, False)
+        batch_size = max(1, batch_size)
+        last_id = None
+
+        while True:
+            page_filter = filter_parameter
+
+            if last_id is not None:
+                page_filter = {'$and': [filter_parameter, {'_id': {'$gt': last_id}}]}
+
+            page = list(
+                collection.find(page_filter, projection, batch_size=batch_size).sort('_id', 1).limit(batch_size)
+            )
+
+            if 0 == len(page):
+                return
+
+            last_id = page[-1]['_id']
+
+            if hydrate_url:
+                page = [self._init_url(document) for document in page]
+
+            yield page
+
+            if len(page) < batch_size:
+                return
+
+    def iter_find(
+            self,
+            collection_name: str,
+            filter_parameter: dict,
+            projection: dict = None,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            hydrate_url: bool = True
+    ) -> Iterator[dict]:
+        for page in self.iter_pages(collection_name, filter_parameter, projection, batch_size, hydrate_url):
+            yield from page
+
     def find_one(self, collection_name: str, filter_parameter: dict, raw: bool = False):
         result = self.get_collection(collection_name, False).find_one(filter_parameter)
 
@@ -130,10 +245,66 @@ class MongoDB:
 
         return [self._init_url(document) for document in result]
 
+    def aggregate(self, collection_name: str, pipeline: list, raw: bool = False):
+        result = self.get_collection(collection_name, False).aggregate(pipeline, allowDiskUse=True)
+
+        if raw is True:
+            return list(result)
+
+        return [self._init_url(document) for document in result]
+
     def migrations(self):
+        from modules.aggregation.custom.html_parser import HtmlParser
+
         try:
-            collection = self.get_collection('crawler', False)
-            from modules.aggregation.custom.html_parser import HtmlParser
-            collection.rename(HtmlParser.COLLECTION_NAME)
+            self.rename_collection('crawler', HtmlParser.COLLECTION_NAME)
         except CollectionDoesNotExist:
             pass
+
+        IndexRegistry.load_modules()
+        IndexRegistry.apply(self)
+        self._collection_names = None
+
+
+class BulkAcknowledger:
+    def __init__(
+            self,
+            mongodb: MongoDB,
+            collection_name: str,
+            update_data: dict,
+            chunk_size: int = MongoDB.DEFAULT_BATCH_SIZE,
+            before_flush: Callable = None
+    ):
+        self._mongodb = mongodb
+        self._collection_name = collection_name
+        self._update_data = update_data
+        self._chunk_size = max(1, chunk_size)
+        self._before_flush = before_flush
+        self._document_ids = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.flush()
+
+    def add(self, document_id: ObjectId):
+        self._document_ids.append(document_id)
+
+        if len(self._document_ids) >= self._chunk_size:
+            self.flush()
+
+    def flush(self):
+        if 0 == len(self._document_ids):
+            return
+
+        if self._before_flush is not None:
+            self._before_flush()
+
+        document_ids, self._document_ids = self._document_ids, []
+
+        self._mongodb.update_many_by_ids(self._collection_name, document_ids, self._update_data, self._chunk_size)
+
+
+IndexRegistry.register(MongoDB.COLLECTION_NAME_CONFIGURATION, [('hash', 1)], 'hash')
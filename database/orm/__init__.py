@@ -1,10 +1,9 @@
+from database.orm.engine_registry import EngineRegistry
 from database.orm.tables import Tables
 from utilities.configuration import Configuration
 from utilities.configuration import ConfigurationORM
 from utilities.exceptions import ConfigurationMissingError
-from sqlalchemy import create_engine
 from sqlalchemy.engine.result import Result
-from sqlalchemy_utils import database_exists, create_database
 
 
 class ORM:
@@ -16,7 +15,7 @@ class ORM:
         self._connected = False
 
         if type(configuration.databases.orm) is ConfigurationORM:
-            self._engine = create_engine(configuration.databases.orm.connection_url)
+            self._engine = EngineRegistry.get(configuration.databases.orm.connection_url)
         else:
             raise ConfigurationMissingError('No orm database connection configured')
 
@@ -28,8 +27,7 @@ class ORM:
         self.close()
 
     def connect(self):
-        if not database_exists(self._engine.url):
-            create_database(self._engine.url)
+        EngineRegistry.ensure_database(self._engine)
 
         self._connection = self._engine.connect()
         self.tables = Tables(self._connection, self._configuration)
@@ -42,5 +40,16 @@ class ORM:
     def is_connected(self):
         return self._connected
 
+    @property
+    def dialect_name(self) -> str:
+        return self._engine.dialect.name
+
+    def begin(self):
+        # statements executed before auto-begin a transaction, which has to end before an explicit one can start
+        if self._connection.in_transaction():
+            self._connection.commit()
+
+        return self._connection.begin()
+
     def execute(self, statement) -> Result:
         return self._connection.execute(statement)
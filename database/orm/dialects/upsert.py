@@ -0,0 +1,21 @@
+from sqlalchemy import Table
+from sqlalchemy import insert
+from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
+from typing import Sequence
+
+
+def insert_ignore_duplicates(table: Table, dialect_name: str, index_elements: Sequence[str]):
+    if 'mysql' == dialect_name or 'mariadb' == dialect_name:
+        statement = mysql.insert(table)
+
+        return statement.on_duplicate_key_update({index_elements[0]: statement.inserted[index_elements[0]]})
+
+    if 'postgresql' == dialect_name:
+        return postgresql.insert(table).on_conflict_do_nothing(index_elements=index_elements)
+
+    if 'sqlite' == dialect_name:
+        return sqlite.insert(table).on_conflict_do_nothing(index_elements=index_elements)
+
+    return insert(table)
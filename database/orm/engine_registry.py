@@ -0,0 +1,59 @@
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy_utils import database_exists, create_database
+from threading import Lock
+
+
+class EngineRegistry:
+    DEFAULT_POOL_SIZE = 5
+    DEFAULT_MAX_OVERFLOW = 10
+    DEFAULT_POOL_RECYCLE = 3600
+    POOL_SIZE_UNSUPPORTED_BACKENDS = ['sqlite']
+
+    _engines = {}
+    _existing_databases = set()
+    _lock = Lock()
+
+    @staticmethod
+    def get(connection_url: str) -> Engine:
+        with EngineRegistry._lock:
+            if connection_url not in EngineRegistry._engines:
+                EngineRegistry._engines[connection_url] = create_engine(
+                    connection_url,
+                    **EngineRegistry._engine_options(connection_url)
+                )
+
+            return EngineRegistry._engines[connection_url]
+
+    @staticmethod
+    def ensure_database(engine: Engine):
+        connection_url = engine.url.render_as_string(hide_password=False)
+
+        with EngineRegistry._lock:
+            if connection_url in EngineRegistry._existing_databases:
+                return
+
+            if not database_exists(engine.url):
+                create_database(engine.url)
+
+            EngineRegistry._existing_databases.add(connection_url)
+
+    @staticmethod
+    def dispose():
+        with EngineRegistry._lock:
+            engines, EngineRegistry._engines = EngineRegistry._engines, {}
+            EngineRegistry._existing_databases = set()
+
+        for engine in engines.values():
+            engine.dispose()
+
+    @staticmethod
+    def _engine_options(connection_url: str) -> dict:
+        options = {'pool_pre_ping': True, 'pool_recycle': EngineRegistry.DEFAULT_POOL_RECYCLE}
+
+        if make_url(connection_url).get_backend_name() not in EngineRegistry.POOL_SIZE_UNSUPPORTED_BACKENDS:
+            options['pool_size'] = EngineRegistry.DEFAULT_POOL_SIZE
+            options['max_overflow'] = EngineRegistry.DEFAULT_MAX_OVERFLOW
+
+        return options
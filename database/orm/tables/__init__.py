@@ -3,22 +3,44 @@ from sqlalchemy import MetaData
 from sqlalchemy import Table
 from sqlalchemy import Column
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy import String
 from sqlalchemy import Text
 from sqlalchemy import Boolean
 from sqlalchemy import DateTime
+from sqlalchemy import inspect
+from sqlalchemy import bindparam
+from sqlalchemy import select
+from sqlalchemy import func
+from sqlalchemy import text
+from sqlalchemy.schema import DropIndex
+from sqlalchemy.exc import DBAPIError
 from database.orm.dialects.types import UnsignedInt
 from utilities.configuration import Configuration
 from utilities.exceptions import TableDoesNotExistError
+from threading import Lock
+from hashlib import sha256
 
 
 class Tables:
+    URL_COLUMNS = ['protocol', 'domain', 'path', 'query']
+    URL_HASH_COLUMN = 'url_hash'
+    URL_HASH_MIGRATION_BATCH_SIZE = 1000
+
+    _metadata = {}
+    _created = set()
+    _lock = Lock()
+
     def __init__(self, connection: Connection, configuration: Configuration):
         self.connection = connection
         self.configuration = configuration
         self.tables = {}
         self._init_tables()
 
+    @staticmethod
+    def url_hash(protocol: str, domain: str, path: str, query: str) -> str:
+        return sha256('\0'.join([protocol, domain, path, query]).encode('utf-8')).hexdigest()
+
     @staticmethod
     def urlset_tablename(urlset: str):
         return 'urls_' + urlset
@@ -28,7 +50,19 @@ class Tables:
         return 'checks_' + urlset
 
     def _init_tables(self):
-        metadata = MetaData(bind=self.connection)
+        if self.configuration.hash is None:
+            self.tables = self._build_tables(MetaData())
+            return
+
+        with Tables._lock:
+            if self.configuration.hash not in Tables._metadata:
+                metadata = MetaData()
+                Tables._metadata[self.configuration.hash] = (metadata, self._build_tables(metadata))
+
+            self.tables = dict(Tables._metadata[self.configuration.hash][1])
+
+    def _build_tables(self, metadata: MetaData) -> dict:
+        tables = {}
 
         for configuration_urlset in self.configuration.urlsets.urlsets:
             urlset_urls = Table(
@@ -39,9 +73,15 @@ class Tables:
                 Column('domain', String(255), nullable=False, default=''),
                 Column('path', String(2048), nullable=False, default=''),
                 Column('query', String(2048), nullable=False, default=''),
+                Column(self.URL_HASH_COLUMN, String(64), nullable=False, default=''),
+                Index(
+                    self.urlset_tablename(configuration_urlset.name) + '_url_hash',
+                    self.URL_HASH_COLUMN,
+                    unique=True
+                ),
             )
 
-            self.tables[self.urlset_tablename(configuration_urlset.name)] = urlset_urls
+            tables[self.urlset_tablename(configuration_urlset.name)] = urlset_urls
 
             urlset_checks = Table(
                 self.checks_tablename(configuration_urlset.name),
@@ -57,12 +97,102 @@ class Tables:
                 Column('error', String(127), nullable=False, default=''),
             )
 
-            self.tables[self.checks_tablename(configuration_urlset.name)] = urlset_checks
+            tables[self.checks_tablename(configuration_urlset.name)] = urlset_checks
+
+        return tables
 
     def create_tables(self):
+        created_key = (self.connection.engine.url.render_as_string(hide_password=False), self.configuration.hash)
+
+        if self.configuration.hash is not None and created_key in Tables._created:
+            return
+
         for table_name, table in self.tables.items():
             table.create(self.connection, checkfirst=True)
 
+        for configuration_urlset in self.configuration.urlsets.urlsets:
+            self._migrate_url_hash(
+                self.table_urlset_urls(configuration_urlset.name),
+                self.table_urlset_checks(configuration_urlset.name)
+            )
+
+        for table_name, table in self.tables.items():
+            for index in table.indexes:
+                try:
+                    index.create(self.connection, checkfirst=True)
+                except DBAPIError as error:
+                    # the url ids are resolved by inserts which rely on the unique index to ignore duplicates
+                    if index.unique:
+                        raise
+
+                    print('Could not create index "' + str(index.name) + '": ' + str(error.orig))
+
+        if self.connection.in_transaction():
+            self.connection.commit()
+
+        if self.configuration.hash is not None:
+            Tables._created.add(created_key)
+
+    def _migrate_url_hash(self, table: Table, checks_table: Table):
+        inspector = inspect(self.connection)
+        indexes = inspector.get_indexes(table.name)
+
+        # the prefix index of earlier versions let urls collide that only differ after 191 characters
+        for index in indexes:
+            if table.name + '_url' == index['name']:
+                self.connection.execute(DropIndex(Index(
+                    index['name'],
+                    Table(table.name, MetaData(), Column('protocol', String(8))).c.protocol
+                )))
+
+        if self.URL_HASH_COLUMN not in [column['name'] for column in inspector.get_columns(table.name)]:
+            preparer = self.connection.dialect.identifier_preparer
+
+            self.connection.execute(text(
+                'ALTER TABLE ' + preparer.format_table(table) +
+                ' ADD COLUMN ' + preparer.quote(self.URL_HASH_COLUMN) + ' ' +
+                table.c[self.URL_HASH_COLUMN].type.compile(dialect=self.connection.dialect) +
+                " NOT NULL DEFAULT ''"
+            ))
+
+        while True:
+            rows = self.connection.execute(
+                select(table.c.id, *[table.c[column] for column in self.URL_COLUMNS])
+                .where(table.c[self.URL_HASH_COLUMN] == '')
+                .limit(self.URL_HASH_MIGRATION_BATCH_SIZE)
+            ).all()
+
+            if 0 == len(rows):
+                break
+
+            self.connection.execute(
+                table.update().where(table.c.id == bindparam('row_id')).values({
+                    self.URL_HASH_COLUMN: bindparam('row_url_hash')
+                }),
+                [{'row_id': row[0], 'row_url_hash': self.url_hash(row[1], row[2], row[3], row[4])} for row in rows]
+            )
+
+        if table.name + '_url_hash' not in [index['name'] for index in indexes]:
+            self._merge_duplicate_urls(table, checks_table)
+
+    def _merge_duplicate_urls(self, table: Table, checks_table: Table):
+        # the prefix index never enforced uniqueness, the checks of duplicate urls move to the oldest row
+        duplicates = self.connection.execute(
+            select(table.c[self.URL_HASH_COLUMN], func.min(table.c.id))
+            .group_by(table.c[self.URL_HASH_COLUMN])
+            .having(func.count() > 1)
+        ).all()
+
+        for url_hash, url_id in duplicates:
+            duplicate_ids = self.connection.execute(
+                select(table.c.id).where(table.c[self.URL_HASH_COLUMN] == url_hash).where(table.c.id != url_id)
+            ).scalars().all()
+
+            self.connection.execute(checks_table.update().where(checks_table.c.url.in_(duplicate_ids)).values({
+                'url': url_id
+            }))
+            self.connection.execute(table.delete().where(table.c.id.in_(duplicate_ids)))
+
     def table(self, table_name) -> Table:
         if table_name in self.tables:
             return self.tables[table_name]
@@ -1,6 +1,7 @@
 from database.orm.tables._abstract_table import _AbstractTable
 from sqlalchemy.sql import and_
 from datetime import datetime
+from typing import Sequence
 
 
 class ChecksUrlset(_AbstractTable):
@@ -45,3 +46,24 @@ class ChecksUrlset(_AbstractTable):
         insert_id = result.inserted_primary_key[0]
 
         return insert_id
+
+    def add_many(self, urlset: str, rows: Sequence[dict]):
+        if 0 == len(rows):
+            return
+
+        self._table = self._orm.tables.table_urlset_checks(urlset)
+
+        now = datetime.utcnow()
+
+        self._orm.execute(self._table.insert().values([
+            {
+                'created': now,
+                'last_checked': now,
+                'url': row['url'],
+                'check': row['check'],
+                'valid': row['valid'],
+                'value': row.get('value', ''),
+                'diff': row.get('diff', ''),
+                'error': row.get('error', ''),
+            } for row in rows
+        ]))
@@ -1,8 +1,19 @@
+from database.orm import ORM
+from database.orm.tables import Tables
 from database.orm.tables._abstract_table import _AbstractTable
+from database.orm.dialects.upsert import insert_ignore_duplicates
 from sqlalchemy.sql import and_
+from sqlalchemy.sql import select
+from typing import Sequence
 
 
 class UrlsUrlset(_AbstractTable):
+    INSERT_BATCH_SIZE = 500
+
+    def __init__(self, orm: ORM):
+        super().__init__(orm)
+        self._cached_ids = {}
+
     def _check_existing_url(self, protocol: str, domain: str, path: str, query: str):
         existing_row = self._orm.execute(self._table.select().where(and_(
             protocol == self._table.c.protocol,
@@ -18,6 +29,50 @@ class UrlsUrlset(_AbstractTable):
 
         return None
 
+    def _load_ids(self, urlset: str, urls: Sequence[tuple] = None):
+        table = self._orm.tables.table_urlset_urls(urlset)
+        statement = select(table.c.id, *[table.c[column] for column in Tables.URL_COLUMNS])
+        cached_ids = self._cached_ids.setdefault(urlset, {})
+
+        if urls is not None:
+            statement = statement.where(
+                table.c[Tables.URL_HASH_COLUMN].in_([Tables.url_hash(*url) for url in urls])
+            )
+
+        for row in self._orm.execute(statement):
+            url = (row[1], row[2], row[3], row[4])
+
+            if url not in cached_ids or row[0] < cached_ids[url]:
+                cached_ids[url] = row[0]
+
+    def clear_cache(self):
+        self._cached_ids = {}
+
+    def preload(self, urlset: str):
+        if urlset not in self._cached_ids:
+            self._load_ids(urlset)
+
+    def get_ids(self, urlset: str, urls: Sequence[tuple]) -> dict:
+        self.preload(urlset)
+
+        cached_ids = self._cached_ids[urlset]
+        missing_urls = list({tuple(url) for url in urls if tuple(url) not in cached_ids})
+
+        if 0 < len(missing_urls):
+            table = self._orm.tables.table_urlset_urls(urlset)
+
+            for offset in range(0, len(missing_urls), self.INSERT_BATCH_SIZE):
+                self._orm.execute(
+                    insert_ignore_duplicates(table, self._orm.dialect_name, [Tables.URL_HASH_COLUMN]).values([
+                        {**dict(zip(Tables.URL_COLUMNS, url)), Tables.URL_HASH_COLUMN: Tables.url_hash(*url)}
+                        for url in missing_urls[offset:offset + self.INSERT_BATCH_SIZE]
+                    ])
+                )
+
+            self._load_ids(urlset, missing_urls)
+
+        return {tuple(url): cached_ids[tuple(url)] for url in urls if tuple(url) in cached_ids}
+
     def add(self, urlset: str, protocol: str, domain: str, path: str, query: str, row_id: int = None) -> int:
         self._table = self._orm.tables.table_urlset_urls(urlset)
 
@@ -26,18 +81,27 @@ class UrlsUrlset(_AbstractTable):
         if existing_row_id is not None:
             return existing_row_id
 
-        existing_row_id = self._check_existing_url(protocol, domain, path, query)
+        if row_id is not None:
+            existing_row_id = self._check_existing_url(protocol, domain, path, query)
 
-        if existing_row_id is not None:
-            return existing_row_id
+            if existing_row_id is not None:
+                return existing_row_id
 
-        self._orm.execute(
-            self._table.insert().values(id=row_id, protocol=protocol, domain=domain, path=path, query=query)
-        )
+            self._orm.execute(
+                self._table.insert().values(
+                    id=row_id,
+                    protocol=protocol,
+                    domain=domain,
+                    path=path,
+                    query=query,
+                    url_hash=Tables.url_hash(protocol, domain, path, query)
+                )
+            )
 
-        existing_row_id = self._check_existing_url(protocol, domain, path, query)
+        url = (protocol, domain, path, query)
+        ids = self.get_ids(urlset, [url])
 
-        if existing_row_id is None:
+        if url not in ids:
             raise Exception("URL not found after insert.")
 
-        return existing_row_id
+        return ids[url]
@@ -1,4 +1,5 @@
 from database.connection import Connection
+from database.orm.engine_registry import EngineRegistry
 from utilities.configuration_loader import ConfigurationLoader
 from utilities.path import Path
 from modules.runner import run
@@ -35,6 +36,9 @@ def setup_periodic_tasks(sender, **kwargs):
             if connection.has_mongodb():
                 connection.mongodb.migrations()
 
+        # the prefork workers must not inherit the pooled database connections of the startup migrations
+        EngineRegistry.dispose()
+
         with open(Path.var_folder_path() + '/' + configuration.hash + '.pickle', 'wb') as handle:
             pickle.dump(configuration, handle, protocol=pickle.HIGHEST_PROTOCOL)
 
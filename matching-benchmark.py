@@ -0,0 +1,163 @@
+from service.matching import MatchingEngine
+from pandas import DataFrame, Series
+from argparse import ArgumentParser
+from time import perf_counter
+import random
+import re
+
+WORDS = ['alpha', 'beta', 'gamma', 'delta', 'shop', 'blog', 'news', 'Help', 'pathone', 'pathtwo']
+MATCHING_GROUP_REGEX = re.compile(r'\$(\d+)')
+
+
+def _previous_process_expression_regex(
+        row: Series,
+        regex: re.Pattern,
+        input_field: str,
+        output_field: str,
+        output: str
+):
+    value = str(row[input_field])
+    match = regex.search(value)
+
+    if type(match) is re.Match:
+        for group in MATCHING_GROUP_REGEX.search(output).groups():
+            try:
+                output = output.replace('$' + group, match.group(int(group)))
+            except IndexError:
+                pass
+
+        row[output_field] = output
+
+    return row
+
+
+def _previous_process_data(data: DataFrame, matches: list) -> DataFrame:
+    for match in matches:
+        input_field = match['inputField']
+        output_field = match['outputField']
+        fallback = match['fallback']
+
+        data[output_field] = ''
+
+        for expression in match['expressions']:
+            if 'regex' in expression:
+                data = data.apply(
+                    _previous_process_expression_regex,
+                    args=(expression['regex'], input_field, output_field, expression['output']),
+                    axis=1
+                )
+            elif 'csv' in expression:
+                case_sensitive = expression['caseSensitive']
+                csv = expression['csv']
+
+                for output_column in csv:
+                    for column in csv[output_column]:
+                        data.loc[
+                            data[input_field].str.contains(
+                                column,
+                                regex=expression['useRegex'],
+                                flags=0 if case_sensitive else re.IGNORECASE,
+                                case=case_sensitive
+                            ),
+                            output_field
+                        ] = output_column
+
+        if 0 < len(fallback):
+            data[output_field] = data[output_field].replace('', fallback)
+
+    return data
+
+
+def _engine_process_data(data: DataFrame, matches: list) -> DataFrame:
+    for match in matches:
+        data[match['outputField']] = MatchingEngine(match['expressions'], match['fallback']).match(
+            data[match['inputField']]
+        )
+
+    return data
+
+
+def _random_path_segment() -> str:
+    return random.choice(WORDS) + str(random.randint(0, 300))
+
+
+def _build_data(rows: int) -> DataFrame:
+    return DataFrame({'page': [
+        'https://www.property.com/' + '/'.join(_random_path_segment() for _ in range(3)) +
+        random.choice(['.html', '.pdf', '.HTML', ''])
+        for _ in range(rows)
+    ]})
+
+
+def _build_matches(keywords: int) -> list:
+    keyword_list = [_random_path_segment() for _ in range(keywords - keywords % 2)]
+
+    return [{
+        'inputField': 'page',
+        'outputField': 'matched',
+        'fallback': 'NONE',
+        'expressions': [
+            {'regex': re.compile(r'\.(html)$', re.IGNORECASE), 'output': 'HTML-$1'},
+            {'regex': re.compile(r'/(\w+?)\d+\.pdf$'), 'output': 'PDF-$1'},
+            {
+                'csv': DataFrame({
+                    'A': keyword_list[:len(keyword_list) // 2],
+                    'B': keyword_list[len(keyword_list) // 2:],
+                }),
+                'useRegex': False,
+                'caseSensitive': True,
+            },
+            {
+                'csv': DataFrame({'H': [r'help\d+'], 'S': [r'shop1\d\d']}),
+                'useRegex': True,
+                'caseSensitive': False,
+            },
+            {
+                'csv': DataFrame({'CI': ['HELP1', 'alpha2']}),
+                'useRegex': False,
+                'caseSensitive': False,
+            },
+        ],
+    }]
+
+
+def _measure(process_data, data: DataFrame, matches: list, repeat: int) -> tuple:
+    durations = []
+    result = None
+
+    for _ in range(repeat):
+        timer = perf_counter()
+        result = process_data(data.copy(), matches)
+        durations.append(perf_counter() - timer)
+
+    return min(durations), result
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Compare the previous GSC matching with the MatchingEngine')
+    parser.add_argument('--rows', type=int, default=25000)
+    parser.add_argument('--keywords', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=1)
+    arguments = parser.parse_args()
+
+    random.seed(arguments.seed)
+
+    benchmark_data = _build_data(arguments.rows)
+    benchmark_matches = _build_matches(arguments.keywords)
+
+    previous_duration, previous_result = _measure(
+        _previous_process_data,
+        benchmark_data,
+        benchmark_matches,
+        arguments.repeat
+    )
+    engine_duration, engine_result = _measure(_engine_process_data, benchmark_data, benchmark_matches, arguments.repeat)
+
+    print('rows: {:d}, keywords: {:d}'.format(arguments.rows, arguments.keywords))
+    print('previous implementation: {:.3f}s'.format(previous_duration))
+    print('matching engine:         {:.3f}s'.format(engine_duration))
+    print('speedup:                 {:.1f}x'.format(previous_duration / engine_duration))
+    print('identical output:        {}'.format(
+        (previous_result['matched'].values == engine_result['matched'].values).all()
+    ))
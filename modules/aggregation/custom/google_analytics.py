@@ -1,5 +1,6 @@
 from database.connection import Connection
 from database.bigquery import BigQuery
+from database.index_registry import IndexRegistry
 from utilities.configuration import Configuration
 from utilities.exceptions import ConfigurationMissingError, ConfigurationInvalidError
 from googleapiclient.discovery import build
@@ -576,3 +577,6 @@ class GoogleAnalytics:
             },
             cursor=True
         ).count()
+
+
+IndexRegistry.register(GoogleAnalytics.COLLECTION_NAME, [('view', 1), ('date', 1)], 'view_date')
@@ -1,4 +1,5 @@
 from database.connection import Connection
+from database.index_registry import IndexRegistry
 from utilities.configuration import Configuration
 from utilities.exceptions import ConfigurationInvalidError, ConfigurationMissingError
 from utilities.thread import ResultThread
@@ -485,3 +486,6 @@ class GooglePagespeed:
                 return False
 
         return True
+
+
+IndexRegistry.register(GooglePagespeed.COLLECTION_NAME_RETRY, [('hash', 1)], 'hash')
@@ -1,21 +1,32 @@
 from database.connection import Connection
 from database.bigquery import BigQuery
+from database.index_registry import IndexRegistry
+from service.api import SearchConsoleQueryScheduler
 from utilities.configuration import Configuration
-from utilities.exceptions import ConfigurationMissingError
-from googleapiclient.discovery import build, Resource
+from utilities.exceptions import ConfigurationMissingError, ConfigurationInvalidError
+from googleapiclient.discovery import build
 from googleapiclient.errors import UnknownApiNameOrVersion, HttpError
 from google.api_core.exceptions import BadRequest
 from google.cloud.bigquery import LoadJobConfig, TimePartitioning, TimePartitioningType, TableReference, SchemaField
+from google.cloud.bigquery import SourceFormat
 from google.cloud.bigquery.job import WriteDisposition
 from google.oauth2 import service_account
-from pandas import DataFrame, Series, concat
+from pymongo import ReturnDocument
+from pyarrow import RecordBatch, array, date32, float64, string
+from pyarrow.parquet import ParquetWriter
 from dict_hash import sha256
-from os.path import abspath
+from os.path import abspath, join
 from datetime import date, datetime, timedelta
 from dateutil.relativedelta import relativedelta
 from time import time
 from calendar import monthrange
 from socket import timeout
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tempfile import TemporaryDirectory, TemporaryFile
+from typing import Iterable, Iterator
+import json
+import pickle
+import sqlite3
 
 
 class _DataAlreadyExistError(Exception):
@@ -26,11 +37,85 @@ class _DataNotAvailableYet(Exception):
     pass
 
 
+class _DocumentStore:
+    # a day of rows and its previous periods are joined on disk, so the parallel backfill days stay small in memory
+    def __init__(self):
+        self._directory = TemporaryDirectory()
+        self._database = sqlite3.connect(join(self._directory.name, 'documents.sqlite'))
+        self._database.execute('CREATE TABLE documents (search_type, keys, document)')
+        self._database.execute(
+            'CREATE TABLE previous_data (search_type, keys, previous_data_column, clicks, impressions)'
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._database.close()
+        self._directory.cleanup()
+
+    def add_documents(self, search_type: str, rows: list, documents: list):
+        self._database.executemany('INSERT INTO documents VALUES (?, ?, ?)', [
+            (search_type, json.dumps(row['keys']), pickle.dumps(document, protocol=pickle.HIGHEST_PROTOCOL))
+            for row, document in zip(rows, documents)
+        ])
+
+    def add_previous_data(self, search_type: str, previous_data_column: str, rows: list):
+        self._database.executemany('INSERT INTO previous_data VALUES (?, ?, ?, ?, ?)', [
+            (
+                search_type,
+                json.dumps(previous_row['keys']),
+                previous_data_column,
+                previous_row.get('clicks'),
+                previous_row.get('impressions'),
+            )
+            for previous_row in rows
+            if previous_row.get('clicks') is not None or previous_row.get('impressions') is not None
+        ])
+
+    def pages(self, page_size: int) -> Iterator[list]:
+        self._database.execute('CREATE INDEX IF NOT EXISTS previous_data_keys ON previous_data (search_type, keys)')
+
+        cursor = self._database.execute(
+            'SELECT documents.rowid, documents.document, previous_data.previous_data_column, '
+            'previous_data.clicks, previous_data.impressions FROM documents '
+            'LEFT JOIN previous_data '
+            'ON previous_data.search_type = documents.search_type AND previous_data.keys = documents.keys '
+            'ORDER BY documents.rowid'
+        )
+        page = []
+        last_row_id = None
+
+        for row_id, document, previous_data_column, clicks, impressions in cursor:
+            if row_id != last_row_id:
+                if page_size <= len(page):
+                    yield page
+                    page = []
+
+                page.append(pickle.loads(document))
+                last_row_id = row_id
+
+            if previous_data_column is not None:
+                page[-1]['clicks' + previous_data_column] = clicks
+                page[-1]['impressions' + previous_data_column] = impressions
+
+        if 0 < len(page):
+            yield page
+
+
 class GoogleSearchConsole:
     COLLECTION_NAME = 'google_search_console'
-    COLLECTION_NAME_CACHE = 'google_search_console_cache'
     COLLECTION_NAME_RETRY = 'google_search_console_retry'
+    COLLECTION_NAME_SPOOL = 'google_search_console_spool'
+    COLLECTION_NAME_BACKFILL = 'google_search_console_backfill'
+    SPOOL_TTL = 60 * 60 * 24
     ROW_LIMIT = 25000
+    DEFAULT_LOAD_BATCH_SIZE = 500000
+    DEFAULT_BACKFILL_PARALLEL_DAYS = 4
+    DATA_LAG_DAYS = 5
     DEFAULT_DIMENSIONS = ['page', 'device', 'query', 'country']
     DEFAULT_SEARCHTYPES = ['web', 'image', 'video']
     DEFAULT_SEARCHTYPE = 'web'
@@ -49,6 +134,40 @@ class GoogleSearchConsole:
         print('Running aggregation GSC Importer:')
         timer_run = time()
         import_properties = []
+        backfill_properties = []
+        max_parallel_requests = SearchConsoleQueryScheduler.DEFAULT_MAX_PARALLEL_REQUESTS
+        queries_per_second = SearchConsoleQueryScheduler.DEFAULT_QUERIES_PER_SECOND
+        prefetch_pages = SearchConsoleQueryScheduler.DEFAULT_PREFETCH_PAGES
+
+        if 'maxParallelRequests' in self.module_configuration.settings and \
+                type(self.module_configuration.settings['maxParallelRequests']) is int:
+            max_parallel_requests = self.module_configuration.settings['maxParallelRequests']
+
+        if 'queriesPerSecond' in self.module_configuration.settings and \
+                type(self.module_configuration.settings['queriesPerSecond']) in [int, float]:
+            queries_per_second = self.module_configuration.settings['queriesPerSecond']
+
+        if 'prefetchPages' in self.module_configuration.settings and \
+                type(self.module_configuration.settings['prefetchPages']) is int:
+            prefetch_pages = self.module_configuration.settings['prefetchPages']
+
+        if 'loadBatchSize' in self.module_configuration.settings and \
+                type(self.module_configuration.settings['loadBatchSize']) is int:
+            load_batch_size = max(1, self.module_configuration.settings['loadBatchSize'])
+        else:
+            load_batch_size = GoogleSearchConsole.DEFAULT_LOAD_BATCH_SIZE
+
+        spool = False
+
+        if 'spoolToMongodb' in self.module_configuration.settings and \
+                type(self.module_configuration.settings['spoolToMongodb']) is bool:
+            spool = self.module_configuration.settings['spoolToMongodb']
+
+        if 'backfillParallelDays' in self.module_configuration.settings and \
+                type(self.module_configuration.settings['backfillParallelDays']) is int:
+            backfill_parallel_days = max(1, self.module_configuration.settings['backfillParallelDays'])
+        else:
+            backfill_parallel_days = GoogleSearchConsole.DEFAULT_BACKFILL_PARALLEL_DAYS
 
         if self.mongodb.has_collection(GoogleSearchConsole.COLLECTION_NAME_RETRY):
             for retry in self.mongodb.find(
@@ -128,20 +247,29 @@ class GoogleSearchConsole:
                 if 0 == len(list(filter(lambda x: x == import_property, import_properties))):
                     import_properties.append(import_property)
 
-        for import_property in import_properties:
-            try:
-                credentials = None
+                if 'backfillFrom' in property_configuration and type(property_configuration['backfillFrom']) is str:
+                    backfill_to = request_date
 
-                if 'credentials' in import_property and type(import_property['credentials']) is str:
-                    credentials = service_account.Credentials.from_service_account_file(
-                        abspath(import_property['credentials']),
-                        scopes=['https://www.googleapis.com/auth/webmasters.readonly']
-                    )
+                    if 'backfillTo' in property_configuration and type(property_configuration['backfillTo']) is str:
+                        backfill_to = self._parse_date(property_configuration['backfillTo'], 'backfillTo')
 
-                api_service = build('searchconsole', 'v1', credentials=credentials, cache_discovery=False)
+                    backfill_properties.append({
+                        **import_property,
+                        'backfillFrom': self._parse_date(property_configuration['backfillFrom'], 'backfillFrom'),
+                        'backfillTo': backfill_to,
+                    })
+
+        for import_property in import_properties:
+            try:
+                query_scheduler = self._create_query_scheduler(
+                    import_property['credentials'],
+                    max_parallel_requests,
+                    queries_per_second,
+                    prefetch_pages
+                )
 
                 self.import_property(
-                    api_service,
+                    query_scheduler,
                     import_property['property'],
                     import_property['requestDate'],
                     import_property['dimensions'],
@@ -150,7 +278,9 @@ class GoogleSearchConsole:
                     import_property['aggregationType'],
                     import_property['database'],
                     import_property['tableName'],
-                    import_property['datasetName']
+                    import_property['datasetName'],
+                    load_batch_size,
+                    spool
                 )
 
                 if '_id' in import_property:
@@ -162,7 +292,7 @@ class GoogleSearchConsole:
                 print(' !!! already exists')
             except _DataNotAvailableYet:
                 print(' !!! not available yet')
-            except (UnknownApiNameOrVersion, HttpError, timeout) as api_error:
+            except (UnknownApiNameOrVersion, HttpError, timeout, BadRequest) as api_error:
                 print(' !!! ERROR')
                 print(api_error)
 
@@ -189,11 +319,172 @@ class GoogleSearchConsole:
                         'datasetName': import_property['datasetName'],
                     })
 
+        for backfill_property in backfill_properties:
+            self.backfill_property(
+                self._create_query_scheduler(
+                    backfill_property['credentials'],
+                    max_parallel_requests,
+                    queries_per_second,
+                    prefetch_pages
+                ),
+                backfill_property,
+                backfill_parallel_days,
+                load_batch_size,
+                spool
+            )
+
         print('\ncompleted: {:s}'.format(str(timedelta(seconds=int(time() - timer_run)))))
 
+    @staticmethod
+    def _parse_date(value: str, key: str) -> date:
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise ConfigurationInvalidError(key + ' must be a date in the format YYYY-MM-DD')
+
+    @staticmethod
+    def _create_query_scheduler(
+            credentials_file: str,
+            max_parallel_requests: int,
+            queries_per_second: float,
+            prefetch_pages: int
+    ) -> SearchConsoleQueryScheduler:
+        credentials = None
+
+        if type(credentials_file) is str:
+            credentials = service_account.Credentials.from_service_account_file(
+                abspath(credentials_file),
+                scopes=['https://www.googleapis.com/auth/webmasters.readonly']
+            )
+
+        return SearchConsoleQueryScheduler(
+            lambda: build('searchconsole', 'v1', credentials=credentials, cache_discovery=False),
+            max_parallel_requests,
+            queries_per_second,
+            prefetch_pages
+        )
+
+    def backfill_property(
+            self,
+            query_scheduler: SearchConsoleQueryScheduler,
+            backfill_property: dict,
+            parallel_days: int = DEFAULT_BACKFILL_PARALLEL_DAYS,
+            load_batch_size: int = DEFAULT_LOAD_BATCH_SIZE,
+            spool: bool = False
+    ):
+        backfill_from = backfill_property['backfillFrom']
+        backfill_to = backfill_property['backfillTo']
+        progress = self.mongodb.get_collection(GoogleSearchConsole.COLLECTION_NAME_BACKFILL).find_one_and_update(
+            {
+                'property': backfill_property['property'],
+                'database': backfill_property['database'],
+                'tableName': backfill_property['tableName'],
+                'datasetName': backfill_property['datasetName'],
+                'backfillFrom': datetime.combine(backfill_from, datetime.min.time()),
+            },
+            {
+                '$setOnInsert': {
+                    'backfillTo': datetime.combine(backfill_to, datetime.min.time()),
+                    'completedDates': [],
+                    'emptyDates': [],
+                    'finished': False,
+                }
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        # the end of the backfill moves with dateDaysAgo, a finished backfill only continues for the new days
+        if progress['finished'] and progress['backfillTo'].date() >= backfill_to:
+            return
+
+        if progress['backfillTo'].date() != backfill_to:
+            self.mongodb.update_one(
+                GoogleSearchConsole.COLLECTION_NAME_BACKFILL,
+                progress['_id'],
+                {'backfillTo': datetime.combine(backfill_to, datetime.min.time()), 'finished': False}
+            )
+
+        print(' - Backfill: "{:s}" {:%Y-%m-%d} -> {:%Y-%m-%d}'.format(
+            backfill_property['property'],
+            backfill_from,
+            backfill_to
+        ))
+
+        # search console publishes recent days with a delay, an empty day is only final once it left that window
+        data_lag_start = date.today() - timedelta(days=GoogleSearchConsole.DATA_LAG_DAYS)
+        skip_dates = {completed_date.date() for completed_date in progress['completedDates']}
+        skip_dates.update(
+            empty_date.date() for empty_date in progress['emptyDates'] if empty_date.date() < data_lag_start
+        )
+
+        if 'bigquery' == backfill_property['database']:
+            skip_dates.update(self._bigquery_existing_dates(
+                backfill_property['property'],
+                self.bigquery.table_reference(backfill_property['tableName'], backfill_property['datasetName']),
+                backfill_from,
+                backfill_to
+            ))
+        else:
+            skip_dates.update(self._mongodb_existing_dates(backfill_property['property'], backfill_from, backfill_to))
+
+        missing_dates = [
+            backfill_from + timedelta(days=days)
+            for days in range((backfill_to - backfill_from).days + 1)
+            if backfill_from + timedelta(days=days) not in skip_dates
+        ]
+        has_open_dates = False
+
+        print('   + {:d} missing days'.format(len(missing_dates)))
+
+        with ThreadPoolExecutor(max_workers=max(1, parallel_days)) as executor:
+            futures = {
+                executor.submit(
+                    self.import_property,
+                    query_scheduler,
+                    backfill_property['property'],
+                    missing_date,
+                    backfill_property['dimensions'],
+                    backfill_property['searchTypes'],
+                    backfill_property['previousData'],
+                    backfill_property['aggregationType'],
+                    backfill_property['database'],
+                    backfill_property['tableName'],
+                    backfill_property['datasetName'],
+                    load_batch_size,
+                    spool,
+                    False
+                ): missing_date for missing_date in missing_dates
+            }
+
+            for future in as_completed(futures):
+                progress_field = 'completedDates'
+
+                try:
+                    future.result()
+                except _DataNotAvailableYet:
+                    if futures[future] >= data_lag_start:
+                        has_open_dates = True
+                        continue
+
+                    progress_field = 'emptyDates'
+                except (UnknownApiNameOrVersion, HttpError, timeout, BadRequest) as api_error:
+                    print(' !!! ERROR {:%Y-%m-%d}'.format(futures[future]))
+                    print(api_error)
+                    has_open_dates = True
+                    continue
+
+                self.mongodb.get_collection(GoogleSearchConsole.COLLECTION_NAME_BACKFILL).update_one(
+                    {'_id': progress['_id']},
+                    {'$addToSet': {progress_field: datetime.combine(futures[future], datetime.min.time())}}
+                )
+
+        if not has_open_dates:
+            self.mongodb.update_one(GoogleSearchConsole.COLLECTION_NAME_BACKFILL, progress['_id'], {'finished': True})
+
     def import_property(
             self,
-            api_service: Resource,
+            query_scheduler: SearchConsoleQueryScheduler,
             gsc_property: str,
             request_date: date,
             dimensions: list,
@@ -202,11 +493,14 @@ class GoogleSearchConsole:
             aggregation_type: str,
             database: str,
             table_name: str,
-            dataset_name: str = None
+            dataset_name: str = None,
+            load_batch_size: int = DEFAULT_LOAD_BATCH_SIZE,
+            spool: bool = False,
+            check_existing_data: bool = True
     ):
         table_reference = self.bigquery.table_reference(table_name, dataset_name)
         previous_dates = {}
-        cache_hash = sha256({'property': gsc_property, 'dimensions': dimensions, 'date': datetime.now().isoformat()})
+        spool_id = None
 
         print(' - Property: "{:s}" - "{:s}"'.format(gsc_property, table_name))
         print('   + {:%Y-%m-%d} -> {:%Y-%m-%d}'.format(request_date, request_date), end='')
@@ -237,188 +531,156 @@ class GoogleSearchConsole:
                     'endDate': previous_date,
                 }
 
-        if 'bigquery' == database and self._bigquery_check_has_existing_data(
+        if check_existing_data and 'bigquery' == database and self._bigquery_check_has_existing_data(
                 gsc_property,
                 table_reference,
                 request_date
         ):
             raise _DataAlreadyExistError()
-        elif 'mongodb' == database and self._mongodb_check_has_existing_data(gsc_property, request_date):
+        elif check_existing_data and 'mongodb' == database and \
+                self._mongodb_check_has_existing_data(gsc_property, request_date):
             raise _DataAlreadyExistError()
 
-        timer_base = time()
+        if spool:
+            spool_id = sha256({
+                'property': gsc_property,
+                'date': request_date.isoformat(),
+                'dimensions': dimensions,
+                'searchTypes': search_types,
+                'previousData': previous_data,
+                'aggregationType': aggregation_type,
+            })
 
-        for search_type in search_types:
-            iteration_count = 0
+        with _DocumentStore() as document_store:
+            if spool_id is not None and self._has_complete_spool(spool_id):
+                print(' - OK - spooled')
+                pages = self._iter_spool(spool_id)
+            else:
+                self._fetch_documents(
+                    document_store,
+                    query_scheduler,
+                    gsc_property,
+                    request_date,
+                    dimensions,
+                    search_types,
+                    previous_dates,
+                    aggregation_type
+                )
 
-            while True:
-                request = {
-                    'startDate': request_date.strftime('%Y-%m-%d'),
-                    'endDate': request_date.strftime('%Y-%m-%d'),
-                    'searchType': search_type,
-                    'dimensions': dimensions,
-                    'rowLimit': GoogleSearchConsole.ROW_LIMIT,
-                    'startRow': GoogleSearchConsole.ROW_LIMIT * iteration_count
-                }
+                if spool_id is not None:
+                    self._spool_documents(spool_id, document_store.pages(GoogleSearchConsole.ROW_LIMIT))
 
-                if 0 < len(aggregation_type):
-                    request['aggregationType'] = aggregation_type
+                pages = document_store.pages(GoogleSearchConsole.ROW_LIMIT)
 
-                response = api_service.searchanalytics().query(siteUrl=gsc_property, body=request).execute()
+            if 'bigquery' == database:
+                self._load_pages_into_bigquery(pages, table_reference, load_batch_size)
+            else:
+                for page in pages:
+                    self.mongodb.insert_documents(GoogleSearchConsole.COLLECTION_NAME, page)
 
-                if 'rows' not in response:
-                    if 0 == iteration_count and (len(search_types) - 1) == search_types.index(search_type):
-                        cache_entry = None
+        if spool_id is not None:
+            self._clear_spool(spool_id)
 
-                        if self.mongodb.has_collection(GoogleSearchConsole.COLLECTION_NAME_CACHE):
-                            cache_entry = self.mongodb.find_one(
-                                GoogleSearchConsole.COLLECTION_NAME_CACHE,
-                                {'hash': cache_hash},
-                                True
-                            )
+    def _fetch_documents(
+            self,
+            document_store: _DocumentStore,
+            query_scheduler: SearchConsoleQueryScheduler,
+            gsc_property: str,
+            request_date: date,
+            dimensions: list,
+            search_types: list,
+            previous_dates: dict,
+            aggregation_type: str
+    ):
+        timer_base = time()
+        has_rows = False
+        has_last_search_type_rows = True
 
-                        if cache_entry is None:
-                            raise _DataNotAvailableYet()
+        for search_type, start_row, rows in query_scheduler.query(gsc_property, {
+            search_type: self._build_request(request_date, request_date, search_type, dimensions, aggregation_type)
+            for search_type in search_types
+        }):
+            if 0 == len(rows):
+                if 0 == start_row and search_types[-1] == search_type:
+                    has_last_search_type_rows = False
 
-                    break
+                continue
 
-                self._cache_rows(
-                    cache_hash,
-                    gsc_property,
-                    response['rows'],
-                    previous_dates,
-                    request_date,
-                    dimensions,
-                    search_type
-                )
+            has_rows = True
 
-                if len(response['rows']) < GoogleSearchConsole.ROW_LIMIT:
-                    break
+            document_store.add_documents(search_type, rows, self._build_documents(
+                gsc_property,
+                rows,
+                previous_dates,
+                request_date,
+                dimensions,
+                search_type
+            ))
 
-                iteration_count = iteration_count + 1
+        if not has_rows and not has_last_search_type_rows:
+            raise _DataNotAvailableYet()
 
         print(' - OK - {:s}'.format(str(timedelta(seconds=int(time() - timer_base)))))
 
-        for previous_data_column, previous_date in previous_dates.items():
+        if 0 < len(previous_dates):
             print(
-                '   + {:%Y-%m-%d} -> {:%Y-%m-%d}'.format(
-                    previous_date['startDate'],
-                    previous_date['endDate']
-                ),
+                '   + ' + ', '.join([
+                    '{:%Y-%m-%d} -> {:%Y-%m-%d}'.format(previous_date['startDate'], previous_date['endDate'])
+                    for previous_date in previous_dates.values()
+                ]),
                 end=''
             )
 
             timer_previous = time()
 
-            for search_type in search_types:
-                iteration_count = 0
-
-                while True:
-                    request = {
-                        'startDate': previous_date['startDate'].strftime('%Y-%m-%d'),
-                        'endDate': previous_date['endDate'].strftime('%Y-%m-%d'),
-                        'searchType': search_type,
-                        'dimensions': dimensions,
-                        'rowLimit': GoogleSearchConsole.ROW_LIMIT,
-                        'startRow': GoogleSearchConsole.ROW_LIMIT * iteration_count
-                    }
-
-                    if 0 < len(aggregation_type):
-                        request['aggregationType'] = aggregation_type
-
-                    response = api_service.searchanalytics().query(siteUrl=gsc_property, body=request).execute()
-
-                    if 'rows' not in response:
-                        break
-
-                    self._add_previous_data(
-                        cache_hash,
-                        search_type,
-                        previous_data_column,
-                        response['rows'],
-                        dimensions,
-                    )
-
-                    if len(response['rows']) < GoogleSearchConsole.ROW_LIMIT:
-                        break
+            for (previous_data_column, search_type), _, rows in query_scheduler.query(gsc_property, {
+                (previous_data_column, search_type): self._build_request(
+                    previous_date['startDate'],
+                    previous_date['endDate'],
+                    search_type,
+                    dimensions,
+                    aggregation_type
+                )
+                for previous_data_column, previous_date in previous_dates.items()
+                for search_type in search_types
+            }):
+                if 0 == len(rows):
+                    continue
 
-                    iteration_count = iteration_count + 1
+                document_store.add_previous_data(search_type, previous_data_column, rows)
 
             print(' - OK - {:s}'.format(str(timedelta(seconds=int(time() - timer_previous)))))
 
-        offset = 0
-
-        while True:
-            rows = self.mongodb.find(
-                GoogleSearchConsole.COLLECTION_NAME_CACHE,
-                {'hash': cache_hash},
-                True,
-                GoogleSearchConsole.ROW_LIMIT,
-                offset
-            )
-
-            if 0 == len(rows):
-                break
-
-            offset += GoogleSearchConsole.ROW_LIMIT
-
-            self._import_rows(database, rows, table_reference)
-
-        self._clear_cache(cache_hash)
-
-    def _add_previous_data(
-            self,
-            cache_hash: str,
+    @staticmethod
+    def _build_request(
+            start_date: date,
+            end_date: date,
             search_type: str,
-            previous_data_column: str,
-            rows: list,
             dimensions: list,
-    ):
-        clicks_column = 'clicks' + previous_data_column
-        impressions_column = 'impressions' + previous_data_column
-
-        for previous_row in rows:
-            current_row = self.mongodb.find_one(
-                GoogleSearchConsole.COLLECTION_NAME_CACHE,
-                {
-                    'hash': cache_hash,
-                    'searchType': search_type,
-                    'dimensions': self._process_dimensions_column(previous_row['keys'], dimensions)
-                }
-            )
-
-            if type(current_row) is dict:
-                previous_clicks = None
-                previous_impressions = None
-
-                if 'clicks' in previous_row and previous_row['clicks'] is not None:
-                    previous_clicks = previous_row['clicks']
+            aggregation_type: str
+    ) -> dict:
+        request = {
+            'startDate': start_date.strftime('%Y-%m-%d'),
+            'endDate': end_date.strftime('%Y-%m-%d'),
+            'searchType': search_type,
+            'dimensions': dimensions,
+        }
 
-                if 'impressions' in previous_row and previous_row['impressions'] is not None:
-                    previous_impressions = previous_row['impressions']
+        if 0 < len(aggregation_type):
+            request['aggregationType'] = aggregation_type
 
-                if previous_clicks is not None or previous_impressions is not None:
-                    self.mongodb.update_one(
-                        GoogleSearchConsole.COLLECTION_NAME_CACHE,
-                        current_row['_id'],
-                        {
-                            clicks_column: previous_clicks,
-                            impressions_column: previous_impressions
-                        }
-                    )
+        return request
 
-    def _cache_rows(
+    def _build_documents(
             self,
-            cache_hash: str,
             gsc_property: str,
             rows: list,
             previous_dates: dict,
             request_date: date,
             dimensions: list,
             search_type: str
-    ):
+    ) -> list:
         documents = []
-        mongodb = self.connection.mongodb
         previous_clicks_columns = {
             'clicks' + previous_date_column: None
             for previous_date_column, _ in previous_dates.items()
@@ -431,7 +693,6 @@ class GoogleSearchConsole:
         for row in rows:
             documents.append({
                 **{
-                    'hash': cache_hash,
                     'property': gsc_property,
                     'date': datetime.combine(request_date, datetime.min.time()),
                     'clicks': row['clicks'],
@@ -445,54 +706,124 @@ class GoogleSearchConsole:
                 **previous_impressions_columns,
             })
 
-        mongodb.insert_documents(GoogleSearchConsole.COLLECTION_NAME_CACHE, documents)
+        return documents
 
-    def _clear_cache(self, cache_hash: str):
-        self.mongodb.get_collection(GoogleSearchConsole.COLLECTION_NAME_CACHE).delete_many({'hash': cache_hash})
+    def _has_complete_spool(self, spool_id: str) -> bool:
+        if not self.mongodb.has_collection(GoogleSearchConsole.COLLECTION_NAME_SPOOL):
+            return False
 
-    def _import_rows(
-            self,
-            database: str,
-            rows: list,
-            table_reference: TableReference = None
-    ):
-        for row in rows:
-            row.pop('_id')
-            row.pop('hash')
+        return self.mongodb.find_one(
+            GoogleSearchConsole.COLLECTION_NAME_SPOOL,
+            {'spoolId': spool_id, 'complete': True}
+        ) is not None
+
+    def _iter_spool(self, spool_id: str) -> Iterator[list]:
+        for spooled_rows in self.mongodb.iter_pages(
+                GoogleSearchConsole.COLLECTION_NAME_SPOOL,
+                {'spoolId': spool_id, 'row': {'$exists': True}},
+                batch_size=GoogleSearchConsole.ROW_LIMIT,
+                hydrate_url=False
+        ):
+            yield [spooled_row['row'] for spooled_row in spooled_rows]
 
-        if 'bigquery' == database:
-            self.process_response_rows_for_bigquery(rows, table_reference)
-        else:
-            self.mongodb.insert_documents(GoogleSearchConsole.COLLECTION_NAME, rows)
+    def _spool_documents(self, spool_id: str, pages: Iterable[list]):
+        created = datetime.utcnow()
 
-    def process_response_rows_for_bigquery(
-            self,
-            rows: list,
-            table_reference: TableReference
-    ):
-        rows_dataframe = DataFrame.from_records(rows)
+        self._clear_spool(spool_id)
 
-        rows_dataframe = concat([rows_dataframe, rows_dataframe['dimensions'].apply(Series)], axis=1, join='inner')
-        rows_dataframe = rows_dataframe.drop(['dimensions'], axis=1)
-        rows_dataframe['date'] = rows_dataframe['date'].apply(lambda x: x.date())
+        for page in pages:
+            self.mongodb.insert_documents(GoogleSearchConsole.COLLECTION_NAME_SPOOL, [
+                {'spoolId': spool_id, 'created': created, 'row': document}
+                for document in page
+            ])
+
+        self.mongodb.insert_document(
+            GoogleSearchConsole.COLLECTION_NAME_SPOOL,
+            {'spoolId': spool_id, 'created': created, 'complete': True}
+        )
 
+    def _clear_spool(self, spool_id: str):
+        self.mongodb.get_collection(GoogleSearchConsole.COLLECTION_NAME_SPOOL).delete_many({'spoolId': spool_id})
+
+    def _load_pages_into_bigquery(self, pages: Iterable[list], table_reference: TableReference, load_batch_size: int):
+        parquet_file = None
+        parquet_writer = None
+        parquet_rows = 0
+
+        for rows in pages:
+            if 0 == len(rows):
+                continue
+
+            record_batch = self._build_record_batch(rows)
+
+            if parquet_writer is None:
+                parquet_file = TemporaryFile()
+                parquet_writer = ParquetWriter(parquet_file, record_batch.schema)
+                parquet_rows = 0
+
+            parquet_writer.write_batch(record_batch)
+            parquet_rows = parquet_rows + len(rows)
+
+            if parquet_rows >= load_batch_size:
+                parquet_writer.close()
+                self._load_parquet_into_bigquery(parquet_file, record_batch.schema.names, table_reference)
+                parquet_writer = None
+
+        if parquet_writer is not None:
+            parquet_writer.close()
+            self._load_parquet_into_bigquery(parquet_file, record_batch.schema.names, table_reference)
+
+    def _load_parquet_into_bigquery(self, parquet_file, columns: list, table_reference: TableReference):
         job_config = LoadJobConfig()
+        job_config.source_format = SourceFormat.PARQUET
         job_config.write_disposition = WriteDisposition.WRITE_APPEND
         job_config.time_partitioning = TimePartitioning(type_=TimePartitioningType.DAY, field='date')
-        job_config.schema = [
-            self._get_schema_for_field(column) for column in list(rows_dataframe.columns.values)
-        ]
+        job_config.schema = [self._get_schema_for_field(column) for column in columns]
 
         try:
-            load_job = self.bigquery.client.load_table_from_dataframe(
-                rows_dataframe,
+            load_job = self.bigquery.client.load_table_from_file(
+                parquet_file,
                 table_reference,
+                rewind=True,
                 job_config=job_config
             )
 
             load_job.result()
         except BadRequest as error:
             print(error.errors)
+            raise
+        finally:
+            parquet_file.close()
+
+    def _build_record_batch(self, rows: list) -> RecordBatch:
+        columns = [column for column in rows[0] if 'dimensions' != column]
+        dimensions = [dimension for dimension in rows[0]['dimensions'] if dimension not in columns]
+        arrays = []
+
+        for column in columns:
+            if 'date' == column:
+                values = [row[column].date() for row in rows]
+            else:
+                values = [row[column] for row in rows]
+
+            arrays.append(array(values, type=self._get_arrow_type(column)))
+
+        for dimension in dimensions:
+            arrays.append(array([row['dimensions'][dimension] for row in rows], type=self._get_arrow_type(dimension)))
+
+        return RecordBatch.from_arrays(arrays, names=columns + dimensions)
+
+    @staticmethod
+    def _get_arrow_type(column: str):
+        field_type = GoogleSearchConsole._get_schema_for_field(column).field_type
+
+        if 'DATE' == field_type:
+            return date32()
+
+        if 'FLOAT64' == field_type:
+            return float64()
+
+        return string()
 
     @staticmethod
     def _get_schema_for_field(column: str):
@@ -535,6 +866,42 @@ class GoogleSearchConsole:
 
         return 0 < count
 
+    def _bigquery_existing_dates(
+            self,
+            gsc_property: str,
+            table_reference: TableReference,
+            start_date: date,
+            end_date: date
+    ) -> set:
+        if not self.bigquery.has_table(table_reference.table_id, table_reference.dataset_id):
+            return set()
+
+        query_job = self.bigquery.query(
+            'SELECT DISTINCT date FROM `' + table_reference.dataset_id + '.' + table_reference.table_id + '` ' +
+            'WHERE date BETWEEN "' + start_date.strftime('%Y-%m-%d') + '" ' +
+            'AND "' + end_date.strftime('%Y-%m-%d') + '" ' +
+            'AND property = "' + gsc_property + '"'
+        )
+
+        return {row[0] for row in query_job.result()}
+
+    def _mongodb_existing_dates(self, gsc_property: str, start_date: date, end_date: date) -> set:
+        if not self.mongodb.has_collection(GoogleSearchConsole.COLLECTION_NAME):
+            return set()
+
+        existing_dates = self.mongodb.get_collection(GoogleSearchConsole.COLLECTION_NAME).distinct(
+            'date',
+            {
+                'property': gsc_property,
+                'date': {
+                    '$gte': datetime.combine(start_date, datetime.min.time()),
+                    '$lte': datetime.combine(end_date, datetime.min.time()),
+                }
+            }
+        )
+
+        return {existing_date.date() for existing_date in existing_dates}
+
     def _mongodb_check_has_existing_data(self, gsc_property: str, request_date: date) -> bool:
         if not self.mongodb.has_collection(GoogleSearchConsole.COLLECTION_NAME):
             return False
@@ -551,3 +918,31 @@ class GoogleSearchConsole:
     @staticmethod
     def _process_dimensions_column(dimension_column: list, dimensions_list: list):
         return {dimensions_list[index]: dimension for index, dimension in enumerate(dimension_column)}
+
+
+IndexRegistry.register(
+    GoogleSearchConsole.COLLECTION_NAME,
+    [('property', 1), ('date', 1), ('_id', 1)],
+    'property_date_id'
+)
+IndexRegistry.register(
+    GoogleSearchConsole.COLLECTION_NAME_SPOOL,
+    [('spoolId', 1), ('_id', 1)],
+    'spoolid_id'
+)
+IndexRegistry.register(
+    GoogleSearchConsole.COLLECTION_NAME_SPOOL,
+    [('created', 1)],
+    'created_ttl',
+    expire_after_seconds=GoogleSearchConsole.SPOOL_TTL
+)
+IndexRegistry.register(
+    GoogleSearchConsole.COLLECTION_NAME_BACKFILL,
+    [('property', 1), ('backfillFrom', 1)],
+    'property_backfillfrom'
+)
+IndexRegistry.register(
+    GoogleSearchConsole.COLLECTION_NAME_RETRY,
+    [('property', 1), ('requestDate', 1), ('module', 1)],
+    'property_requestdate_module'
+)
@@ -1,18 +1,21 @@
 from database.connection import Connection
 from utilities.configuration import ConfigurationUrlset, Configuration, ConfigurationUrl
+from database.mongodb import MongoDB
+from database.index_registry import IndexRegistry, MongoDBIndex
+from service.html import BodyStorage, Extractor
+from service.http import Fetcher, RenderPool, ValidatorStore
 from utilities.url import URL
-from utilities.thread import ResultThread
 from datetime import datetime
-from typing import Sequence
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import WebDriverException
+from typing import Iterator, Sequence
+from selenium.common.exceptions import TimeoutException, WebDriverException
 import requests
 
 
 class HtmlParser:
     DEFAULT_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_14_6) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/78.0.3904.87 Safari/537.36'
     COLLECTION_NAME = 'html_parser'
+    RETENTION_INDEX_NAME = 'date_ttl'
+    DEFAULT_INSERT_BATCH_SIZE = 100
 
     def __init__(self, configuration: Configuration, configuration_key: str, connection: Connection):
         self.configuration = configuration
@@ -24,51 +27,152 @@ class HtmlParser:
 
         html_parser_urlsets = self.module_configuration.urlsets
         html_parser_settings = self.module_configuration.settings
+        max_parallel_requests = Fetcher.DEFAULT_MAX_PARALLEL_REQUESTS
+        max_parallel_requests_per_host = Fetcher.DEFAULT_MAX_PARALLEL_REQUESTS_PER_HOST
+        request_timeout = Fetcher.DEFAULT_TIMEOUT
 
+        if 'maxParallelRequests' in html_parser_settings and \
+                type(html_parser_settings['maxParallelRequests']) is int:
+            max_parallel_requests = html_parser_settings['maxParallelRequests']
+
+        if 'maxParallelRequestsPerHost' in html_parser_settings and \
+                type(html_parser_settings['maxParallelRequestsPerHost']) is int:
+            max_parallel_requests_per_host = html_parser_settings['maxParallelRequestsPerHost']
+
+        if 'requestTimeout' in html_parser_settings and type(html_parser_settings['requestTimeout']) is int:
+            request_timeout = html_parser_settings['requestTimeout']
+
+        conditional_requests = True
+
+        if 'conditionalRequests' in html_parser_settings and \
+                type(html_parser_settings['conditionalRequests']) is bool:
+            conditional_requests = html_parser_settings['conditionalRequests']
+
+        if 'insertBatchSize' in html_parser_settings and type(html_parser_settings['insertBatchSize']) is int:
+            insert_batch_size = max(1, html_parser_settings['insertBatchSize'])
+        else:
+            insert_batch_size = HtmlParser.DEFAULT_INSERT_BATCH_SIZE
+
+        render_pool_size = RenderPool.DEFAULT_SIZE
+        render_max_pages_per_browser = RenderPool.DEFAULT_MAX_PAGES_PER_BROWSER
+        render_page_load_timeout = RenderPool.DEFAULT_PAGE_LOAD_TIMEOUT
+
+        if 'renderPoolSize' in html_parser_settings and type(html_parser_settings['renderPoolSize']) is int:
+            render_pool_size = html_parser_settings['renderPoolSize']
+
+        if 'renderMaxPagesPerBrowser' in html_parser_settings and \
+                type(html_parser_settings['renderMaxPagesPerBrowser']) is int:
+            render_max_pages_per_browser = html_parser_settings['renderMaxPagesPerBrowser']
+
+        if 'renderPageLoadTimeout' in html_parser_settings and \
+                type(html_parser_settings['renderPageLoadTimeout']) is int:
+            render_page_load_timeout = html_parser_settings['renderPageLoadTimeout']
+
+        retention_days = 0
+
+        if 'retentionDays' in html_parser_settings and type(html_parser_settings['retentionDays']) is int:
+            retention_days = html_parser_settings['retentionDays']
+
+        mongodb = self.connection.mongodb
+        _apply_retention(mongodb, retention_days)
+        body_storage = BodyStorage(mongodb)
+        validator_store = ValidatorStore(mongodb, body_storage) if conditional_requests else None
+        fetcher = Fetcher(max_parallel_requests, max_parallel_requests_per_host, request_timeout, validator_store)
+        render_pool = RenderPool(render_pool_size, render_max_pages_per_browser, render_page_load_timeout)
         data = []
 
-        for urlset in self.configuration.urlsets.urlsets:
-            for urlset_name in html_parser_urlsets:
-                if urlset_name == urlset.name:
-                    config_hash = self.configuration.hash
-                    data.extend(_process_urlset(urlset, html_parser_settings, config_hash))
+        with fetcher, render_pool:
+            for urlset in self.configuration.urlsets.urlsets:
+                for urlset_name in html_parser_urlsets:
+                    if urlset_name == urlset.name:
+                        config_hash = self.configuration.hash
 
-        self.connection.mongodb.insert_documents(HtmlParser.COLLECTION_NAME, data)
+                        for document in _process_urlset(
+                                fetcher,
+                                render_pool,
+                                urlset,
+                                html_parser_settings,
+                                config_hash
+                        ):
+                            data.append(document)
 
+                            if insert_batch_size <= len(data):
+                                _insert_documents(mongodb, body_storage, data)
+                                data = []
 
-def _process_urlset(configuration_urlset: ConfigurationUrlset, settings: dict, config_hash: str) -> Sequence[dict]:
-    urls = []
+        if 0 < len(data):
+            _insert_documents(mongodb, body_storage, data)
 
-    print(' - "' + configuration_urlset.name + '":')
 
-    threads = []
+def _apply_retention(mongodb: MongoDB, retention_days: int):
+    retention = retention_days * 60 * 60 * 24
+    body_retention = max(retention, ValidatorStore.VALIDATOR_TTL) if 0 < retention else 0
 
-    for configuration_url in configuration_urlset.configuration_urls:
-        thread = ResultThread(_process_url, [
-            configuration_urlset.name,
-            str(configuration_url.url),
-            configuration_url.render,
-            settings,
-            config_hash
-        ])
+    # documents and validators mark their bodies as seen whenever they are stored, so the bodies outlive them
+    _apply_ttl_index(mongodb, HtmlParser.COLLECTION_NAME, 'date', HtmlParser.RETENTION_INDEX_NAME, retention)
+    _apply_ttl_index(mongodb, BodyStorage.COLLECTION_NAME, 'lastSeen', BodyStorage.RETENTION_INDEX_NAME, body_retention)
+
+
+def _apply_ttl_index(mongodb: MongoDB, collection_name: str, field: str, index_name: str, expire_after_seconds: int):
+    collection = mongodb.get_collection(collection_name)
+
+    if 0 < expire_after_seconds:
+        IndexRegistry.apply_index(mongodb, MongoDBIndex(
+            collection_name,
+            [(field, 1)],
+            index_name,
+            expire_after_seconds=expire_after_seconds
+        ))
+    elif index_name in collection.index_information():
+        collection.drop_index(index_name)
+
+
+def _insert_documents(mongodb: MongoDB, body_storage: BodyStorage, documents: Sequence[dict]):
+    body_hashes = body_storage.store_many([document.pop('body') for document in documents])
 
-        thread.start()
-        threads.append(thread)
+    for document, body_hash in zip(documents, body_hashes):
+        document['body_hash'] = body_hash
 
-    for thread in threads:
-        thread.join()
-        urls.append(thread.result)
+    mongodb.insert_documents(HtmlParser.COLLECTION_NAME, documents, ordered=False)
 
-    return urls
 
+def _process_urlset(
+        fetcher: Fetcher,
+        render_pool: RenderPool,
+        configuration_urlset: ConfigurationUrlset,
+        settings: dict,
+        config_hash: str
+) -> Iterator[dict]:
+    print(' - "' + configuration_urlset.name + '":')
 
-def _process_url(urlset: str, url: str, renderbool: bool, settings: dict, config_hash: str) -> dict:
+    return fetcher.process(_process_url, (
+        [
+            fetcher,
+            render_pool,
+            configuration_urlset.name,
+            str(configuration_url.url),
+            configuration_url.render,
+            settings,
+            config_hash
+        ] for configuration_url in configuration_urlset.configuration_urls
+    ))
+
+
+def _process_url(
+        fetcher: Fetcher,
+        render_pool: RenderPool,
+        urlset: str,
+        url: str,
+        renderbool: bool,
+        settings: dict,
+        config_hash: str
+) -> dict:
     try:
         headers = {
             'User-agent': settings['useragent'] if settings['useragent'] else HtmlParser.DEFAULT_USER_AGENT
         }
 
-        response = requests.get(url, headers=headers)
+        response = fetcher.get(url, headers=headers)
         headers = {key: value for key, value in response.headers.items()}
         status_code = response.status_code
         num_redirects = 0
@@ -89,7 +193,7 @@ def _process_url(urlset: str, url: str, renderbool: bool, settings: dict, config
         content_type = response.headers.get('content-type')
 
         if str.startswith(content_type, 'text/html'):
-            body = _render_url(url) if renderbool else response.content
+            body = _render_url(render_pool, url) if renderbool else response.content
             if type(body) is bytes:
                 body = body.decode('utf-8')
         else:
@@ -110,6 +214,7 @@ def _process_url(urlset: str, url: str, renderbool: bool, settings: dict, config
         'redirects': redirects,
         'ttfb': ttfb,
         'body': body,
+        'extracted': Extractor.extract(body),
         'rendered': renderbool,
         'date': datetime.utcnow(),
         'headers': headers,
@@ -117,16 +222,19 @@ def _process_url(urlset: str, url: str, renderbool: bool, settings: dict, config
     }
 
 
-# Todo: refactor making things work with docker, see: "webdriver.Remote"
-def _render_url(url: str) -> str:
+def _render_url(render_pool: RenderPool, url: str) -> str:
     try:
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        driver = webdriver.Chrome(options=chrome_options)
-        driver.get(url)
-        html = driver.page_source.encode('utf-8')
-        driver.close()
+        html = render_pool.render(url)
+    except TimeoutException:
+        html = 'Error: page load timed out'
     except WebDriverException:
         html = 'Error: chromedriver not configured properly'
 
     return html
+
+
+IndexRegistry.register(
+    HtmlParser.COLLECTION_NAME,
+    [('url.protocol', 1), ('url.domain', 1), ('url.path', 1), ('url.query', 1), ('date', -1)],
+    'url_date'
+)
@@ -1,4 +1,5 @@
 from database.connection import Connection
+from service.http import Fetcher, ValidatorStore
 from utilities.configuration import Configuration
 from utilities.url import URL
 
@@ -18,19 +19,30 @@ class Robotstxt:
     def run(self):
         print('Running aggregation robotstxt: ')
         robotstxt_data = []
+        mongodb = self.connection.mongodb
+        validator_store = None
+        conditional_requests = True
 
-        for urlset_name in self.module_configuration.urlsets:
-            print(' - "' + urlset_name + '":')
-            for url in self.configuration.urlsets.urlset_urls(urlset_name):
-                urlstr = str(url)
-                if not urlstr.endswith('/robots.txt'):
-                    robotsstr = url.protocol + '://' + url.domain + str.rstrip(url.path, '/') + '/robots.txt'
-                    url = URL(robotsstr)
-                robotstxt_data.append(self._process_robotstxt(urlset_name, url))
+        if 'conditionalRequests' in self.module_configuration.settings and \
+                type(self.module_configuration.settings['conditionalRequests']) is bool:
+            conditional_requests = self.module_configuration.settings['conditionalRequests']
 
-        self.connection.mongodb.insert_documents(Robotstxt.COLLECTION_NAME, robotstxt_data)
+        if conditional_requests:
+            validator_store = ValidatorStore(mongodb)
 
-    def _process_robotstxt(self, urlset_name: str, url: URL) -> dict:
+        with Fetcher(validator_store=validator_store) as fetcher:
+            for urlset_name in self.module_configuration.urlsets:
+                print(' - "' + urlset_name + '":')
+                for url in self.configuration.urlsets.urlset_urls(urlset_name):
+                    urlstr = str(url)
+                    if not urlstr.endswith('/robots.txt'):
+                        robotsstr = url.protocol + '://' + url.domain + str.rstrip(url.path, '/') + '/robots.txt'
+                        url = URL(robotsstr)
+                    robotstxt_data.append(self._process_robotstxt(fetcher, urlset_name, url))
+
+        mongodb.insert_documents(Robotstxt.COLLECTION_NAME, robotstxt_data)
+
+    def _process_robotstxt(self, fetcher: Fetcher, urlset_name: str, url: URL) -> dict:
         print('   + ' + str(url), end='')
 
         try:
@@ -38,7 +50,7 @@ class Robotstxt:
                 'User-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_14_6) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/78.0.3904.87 Safari/537.36'
             }
 
-            response = requests.get(url, headers=headers)
+            response = fetcher.get(str(url), headers=headers)
             headers = {key: value for key, value in response.headers.items()}
             status_code = response.status_code
             body = response.content
@@ -1,5 +1,6 @@
 from database.bigquery import BigQuery
 from database.connection import Connection
+from database.index_registry import IndexRegistry
 from service.api.sistrix import Client as SistrixApiClient
 from utilities.configuration import Configuration
 from utilities.exceptions import ConfigurationInvalidError, ConfigurationMissingError
@@ -385,3 +386,6 @@ class SistrixDomain:
             },
             cursor=True
         ).count()
+
+
+IndexRegistry.register(SistrixDomain.COLLECTION_NAME, [('date', 1)], 'date')
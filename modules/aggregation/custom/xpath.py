@@ -1,4 +1,5 @@
 from database.connection import Connection
+from service.http import Fetcher, ValidatorStore
 from utilities.exceptions import ConfigurationMissingError, ConfigurationInvalidError
 from utilities.configuration import Configuration
 from utilities.html import strip_html
@@ -11,7 +12,7 @@ from lxml import etree
 from lxml.html import fromstring as document_from_html, HtmlElement
 from datetime import timedelta
 from os.path import realpath
-from requests import get as get_request, Response
+from requests import Response
 from requests.exceptions import RequestException
 from time import time
 from typing import Sequence
@@ -34,11 +35,23 @@ class Xpath:
         self.connection = connection
         self.mongodb = None
         self.bigquery = None
+        self.fetcher = None
 
     def run(self):
         print('Running XPath Module:')
         timer_run = time()
         table_reference = None
+        validator_store = None
+        conditional_requests = True
+
+        if 'conditionalRequests' in self.module_configuration.settings and \
+                type(self.module_configuration.settings['conditionalRequests']) is bool:
+            conditional_requests = self.module_configuration.settings['conditionalRequests']
+
+        if conditional_requests:
+            validator_store = ValidatorStore(self.connection.mongodb)
+
+        self.fetcher = Fetcher(validator_store=validator_store)
 
         if 'bigquery' == self.module_configuration.database:
             self.bigquery = self.connection.bigquery
@@ -76,6 +89,8 @@ class Xpath:
                 table_reference
             )
 
+        self.fetcher.close()
+
         print('\ncompleted: {:s}'.format(str(timedelta(seconds=int(time() - timer_run)))))
 
     def _process_clusters(self, clusters: dict) -> dict:
@@ -301,12 +316,11 @@ class Xpath:
 
         return elements
 
-    @staticmethod
-    def _get_html_from_url(url: str) -> str:
+    def _get_html_from_url(self, url: str) -> str:
         response_body = None
 
         try:
-            response: Response = get_request(url)
+            response: Response = self.fetcher.get(url)
 
             if 200 == response.status_code and str.startswith(response.headers.get('content-type'), 'text/html'):
                 if type(response.content) is bytes:
@@ -3,6 +3,7 @@ from database.bigquery import BigQuery
 from utilities.configuration import Configuration
 from utilities.exceptions import ConfigurationMissingError
 from modules.aggregation.custom.google_search_console import GoogleSearchConsole as AggregationGoogleSearchConsole
+from service.matching import MatchingEngine
 from google.api_core.exceptions import BadRequest
 from google.cloud.bigquery import LoadJobConfig, TimePartitioning, TimePartitioningType
 from google.cloud.bigquery.job import WriteDisposition
@@ -11,7 +12,8 @@ from datetime import date, datetime, timedelta
 from copy import deepcopy
 from os.path import realpath
 from os.path import isfile
-from pandas import DataFrame, Series, read_csv
+from pandas import DataFrame, read_csv
+from typing import Iterator
 import re
 
 
@@ -31,7 +33,6 @@ class GoogleSearchConsole:
         self.connection = connection
         self.mongodb = connection.mongodb
         self.bigquery = None
-        self.matching_group_regex = re.compile(r'\$(\d+)')
 
     def run(self):
         print('Running operation GSC Matching:')
@@ -209,6 +210,7 @@ class GoogleSearchConsole:
                 raise ConfigurationMissingError('missing expressions for match configuration')
 
             match['expressions'] = expressions
+            match['engine'] = MatchingEngine(expressions, match['fallback'])
 
             matches.append(match)
 
@@ -229,6 +231,15 @@ class GoogleSearchConsole:
         output_tablereference = self.bigquery.table_reference(output_table, output_dataset)
 
         iteration_count = 0
+        mongodb_data = None
+
+        if 'bigquery' != database:
+            mongodb_data = self._iter_raw_data_from_mongodb(
+                gsc_property,
+                request_date,
+                AggregationGoogleSearchConsole.COLLECTION_NAME,
+                GoogleSearchConsole.ROW_LIMIT
+            )
 
         while True:
             if 'bigquery' == database:
@@ -241,13 +252,7 @@ class GoogleSearchConsole:
                     iteration_count * GoogleSearchConsole.ROW_LIMIT
                 )
             else:
-                data = self._get_raw_data_from_mongodb(
-                    gsc_property,
-                    request_date,
-                    AggregationGoogleSearchConsole.COLLECTION_NAME,
-                    GoogleSearchConsole.ROW_LIMIT,
-                    iteration_count * GoogleSearchConsole.ROW_LIMIT
-                )
+                data = next(mongodb_data, DataFrame())
 
             if data.empty:
                 if 0 == iteration_count:
@@ -303,26 +308,23 @@ class GoogleSearchConsole:
 
         return data
 
-    def _get_raw_data_from_mongodb(
+    def _iter_raw_data_from_mongodb(
             self,
             gsc_property: str,
             request_date: date,
             input_table: str,
-            limit: int,
-            offset: int
-    ) -> DataFrame:
-        rows = self.mongodb.find(
-            input_table,
-            {
-                'property': gsc_property,
-                'date': datetime.combine(request_date, datetime.min.time())
-            },
-            True,
-            limit,
-            offset
-        )
-
-        return DataFrame(rows)
+            batch_size: int
+    ) -> Iterator[DataFrame]:
+        for rows in self.mongodb.iter_pages(
+                input_table,
+                {
+                    'property': gsc_property,
+                    'date': datetime.combine(request_date, datetime.min.time())
+                },
+                batch_size=batch_size,
+                hydrate_url=False
+        ):
+            yield DataFrame(rows)
 
     def _process_data(self, data: DataFrame, matches: list, exclude_input_fields: list) -> DataFrame:
         if 'date' in exclude_input_fields:
@@ -333,58 +335,10 @@ class GoogleSearchConsole:
                 data = data.drop([exclude_input_field], axis=1)
 
         for match in matches:
-            input_field = match['inputField']
-            output_field = match['outputField']
-            fallback = match['fallback']
-
-            data[output_field] = ''
-
-            for expression in match['expressions']:
-                if 'regex' in expression:
-                    output = expression['output']
-
-                    data = data.apply(
-                        self._process_expression_regex,
-                        args=(expression['regex'], input_field, output_field, output),
-                        axis=1
-                    )
-                elif 'csv' in expression:
-                    case_sensitive = expression['caseSensitive']
-                    use_regex = expression['useRegex']
-                    csv = expression['csv']
-
-                    for output_column in csv:
-                        for column in csv[output_column]:
-                            data.loc[
-                                data[input_field].str.contains(
-                                    column,
-                                    regex=use_regex,
-                                    flags=0 if case_sensitive else re.IGNORECASE,
-                                    case=case_sensitive
-                                ),
-                                output_field
-                            ] = output_column
-
-            if 0 < len(fallback):
-                data[output_field] = data[output_field].replace('', fallback)
+            data[match['outputField']] = match['engine'].match(data[match['inputField']])
 
         return data
 
-    def _process_expression_regex(self, row: Series, regex: re.Pattern, input_field: str, output_field: str, output: str):
-        value = str(row[input_field])
-        match = regex.search(value)
-
-        if type(match) is re.Match:
-            for group in self.matching_group_regex.search(output).groups():
-                try:
-                    output = output.replace('$' + group, match.group(int(group)))
-                except IndexError:
-                    pass
-
-            row[output_field] = output
-
-        return row
-
     def _process_data_for_bigquery(self, data: DataFrame, output_tablereference: TableReference):
         job_config = LoadJobConfig()
         job_config.write_disposition = WriteDisposition.WRITE_APPEND
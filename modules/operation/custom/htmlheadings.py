@@ -1,9 +1,10 @@
 from database.connection import Connection
+from database.index_registry import IndexRegistry
 from service.check import Check
 from utilities.configuration import Configuration
 from utilities.exceptions import ConfigurationMissingError
 from modules.aggregation.custom.html_parser import HtmlParser
-from bs4 import BeautifulSoup
+from service.html import BodyStorage, Extractor, HtmlDocument
 
 
 class Htmlheadings:
@@ -15,6 +16,7 @@ class Htmlheadings:
         self.module_configuration = configuration.operations.get_custom_configuration_operation(configuration_key)
         self.mongodb = connection.mongodb
         self.check_service = Check(connection)
+        self.body_storage = BodyStorage(self.mongodb)
 
     def run(self):
         if len(self.module_configuration.urlsets) > 0:
@@ -29,26 +31,30 @@ class Htmlheadings:
                 for single_urlset in urlset:
                     urlset_name = urlset[single_urlset]
 
-                    parsed_data = self.mongodb.find(
+                    parsed_data = [HtmlDocument(document, self.body_storage) for document in self.mongodb.find(
                         HtmlParser.COLLECTION_NAME,
                         {
                             'urlset': urlset_name,
                             'processed_htmlheadings': {'$exists': False}
                         }
-                    )
+                    )]
 
                     urlset_config = urlset['checks']
 
+                    processed = self.mongodb.acknowledger(
+                        HtmlParser.COLLECTION_NAME,
+                        {'processed_htmlheadings': True},
+                        before_flush=self.check_service.flush
+                    )
+
                     for data in parsed_data:
                         print('   + ' + str(data['url']))
 
                         self.check_count_headline_h1(data, urlset_config)
 
-                        self.mongodb.update_one(
-                            HtmlParser.COLLECTION_NAME,
-                            data['_id'],
-                            {'processed_htmlheadings': True}
-                        )
+                        processed.add(data['_id'])
+
+                    processed.flush()
 
                 print("\n")
 
@@ -61,11 +67,7 @@ class Htmlheadings:
             valid = False
             error = ''
 
-            doc = BeautifulSoup(data['body'], "html.parser")
-            count_headline = 0
-
-            for headline in doc.select("h1"):
-                count_headline += 1
+            count_headline = Extractor.extracted(self.mongodb, HtmlParser.COLLECTION_NAME, data)['headings']['h1']
 
             if count_headline == assert_val:
                 valid = True
@@ -90,3 +92,10 @@ class Htmlheadings:
             )
 
             print(' ... ' + str(valid))
+
+
+IndexRegistry.register(
+    HtmlParser.COLLECTION_NAME,
+    [('urlset', 1), ('processed_htmlheadings', 1)],
+    'urlset_processed_htmlheadings'
+)
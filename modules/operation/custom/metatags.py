@@ -1,14 +1,19 @@
 from database.connection import Connection
+from database.index_registry import IndexRegistry
 from service.check import Check
 from utilities.configuration import Configuration
 from utilities.exceptions import ConfigurationMissingError
 from modules.aggregation.custom.html_parser import HtmlParser
-from bs4 import BeautifulSoup
-import requests
+from service.html import BodyStorage, DuplicateDetector, Extractor, HtmlDocument
+from service.http import Fetcher, StatusCache
 from utilities.url import URL
+from urllib.parse import urljoin
+from datetime import datetime
 
 
 class Metatags:
+    DUPLICATES_DIFF_LIMIT = 100
+
     def __init__(self, configuration: Configuration, configuration_key: str, connection: Connection):
         if not connection.has_bigquery() and not connection.has_orm():
             raise ConfigurationMissingError('Missing a database configuration for this operation')
@@ -17,6 +22,8 @@ class Metatags:
         self.module_configuration = configuration.operations.get_custom_configuration_operation(configuration_key)
         self.mongodb = connection.mongodb
         self.check_service = Check(connection)
+        self.body_storage = BodyStorage(self.mongodb)
+        self.status_cache = None
 
     def run(self):
         if len(self.module_configuration.urlsets) > 0:
@@ -25,55 +32,277 @@ class Metatags:
             if not self.mongodb.has_collection(HtmlParser.COLLECTION_NAME):
                 return
 
-            for urlset in self.module_configuration.urlsets:
-                print(' - "' + str(urlset['url']) + '":')
+            settings = self.module_configuration.settings
+            max_parallel_requests = Fetcher.DEFAULT_MAX_PARALLEL_REQUESTS
+            max_parallel_requests_per_host = Fetcher.DEFAULT_MAX_PARALLEL_REQUESTS_PER_HOST
+            request_timeout = Fetcher.DEFAULT_TIMEOUT
+            canonical_status_ttl = 0
 
-                for single_urlset in urlset:
+            if 'maxParallelRequests' in settings and type(settings['maxParallelRequests']) is int:
+                max_parallel_requests = settings['maxParallelRequests']
 
-                    urlset_name = urlset[single_urlset]
+            if 'maxParallelRequestsPerHost' in settings and type(settings['maxParallelRequestsPerHost']) is int:
+                max_parallel_requests_per_host = settings['maxParallelRequestsPerHost']
 
-                    parsed_data = self.mongodb.find(
-                        HtmlParser.COLLECTION_NAME,
-                        {
-                            'urlset': urlset_name,
-                            'processed_metatags': {'$exists': False}
-                        }
-                    )
+            if 'requestTimeout' in settings and type(settings['requestTimeout']) is int:
+                request_timeout = settings['requestTimeout']
+
+            if 'canonicalStatusTtl' in settings and type(settings['canonicalStatusTtl']) is int:
+                canonical_status_ttl = settings['canonicalStatusTtl']
 
-                    urlset_config = urlset['checks']
+            fetcher = Fetcher(max_parallel_requests, max_parallel_requests_per_host, request_timeout)
+            self.status_cache = StatusCache(fetcher, self.mongodb, canonical_status_ttl)
 
-                    self.check_has_title_duplicates(parsed_data, urlset_name, urlset_config)
-                    self.check_has_description_duplicates(parsed_data, urlset_name, urlset_config)
+            with fetcher:
+                for urlset in self.module_configuration.urlsets:
+                    print(' - "' + str(urlset['url']) + '":')
 
-                    for data in parsed_data:
-                        print('   + ' + str(data['url']))
+                    for single_urlset in urlset:
 
-                        self.check_has_title(data, urlset_name, urlset_config)
-                        self.check_is_title_empty(data, urlset_name, urlset_config)
-                        self.check_has_title_changed(data, urlset_name, urlset_config)
+                        urlset_name = urlset[single_urlset]
+
+                        parsed_data = [HtmlDocument(document, self.body_storage) for document in self.mongodb.find(
+                            HtmlParser.COLLECTION_NAME,
+                            {
+                                'urlset': urlset_name,
+                                'processed_metatags': {'$exists': False}
+                            }
+                        )]
+
+                        urlset_config = urlset['checks']
+
+                        crawls_extracted = self.get_crawls_extracted(parsed_data, urlset_name, urlset_config)
+
+                        self.check_has_title_duplicates(parsed_data, urlset_name, urlset_config, crawls_extracted)
+                        self.check_has_description_duplicates(
+                            parsed_data,
+                            urlset_name,
+                            urlset_config,
+                            crawls_extracted
+                        )
 
-                        self.check_has_description(data, urlset_name, urlset_config)
-                        self.check_is_description_empty(data, urlset_name, urlset_config)
-                        self.check_has_description_changed(data, urlset_name, urlset_config)
+                        self.resolve_canonical_statuses(parsed_data, urlset_name, urlset_config)
 
-                        self.check_has_canonical(data, urlset_name, urlset_config)
-                        self.check_canonical_is_self_referencing(data, urlset_name, urlset_config)
-                        self.check_canonical_href_200(data, urlset_name, urlset_config)
+                        previous_extracted = self.get_previous_extracted(parsed_data, urlset_config)
 
-                        self.mongodb.update_one(
+                        processed = self.mongodb.acknowledger(
                             HtmlParser.COLLECTION_NAME,
-                            data['_id'],
-                            {'processed_metatags': True}
+                            {'processed_metatags': True},
+                            before_flush=self.check_service.flush
                         )
 
-                print("\n")
+                        for data in parsed_data:
+                            print('   + ' + str(data['url']))
+
+                            self.check_has_title(data, urlset_name, urlset_config)
+                            self.check_is_title_empty(data, urlset_name, urlset_config)
+                            self.check_has_title_changed(data, urlset_name, urlset_config, previous_extracted)
+
+                            self.check_has_description(data, urlset_name, urlset_config)
+                            self.check_is_description_empty(data, urlset_name, urlset_config)
+                            self.check_has_description_changed(
+                                data,
+                                urlset_name,
+                                urlset_config,
+                                previous_extracted
+                            )
+
+                            self.check_has_canonical(data, urlset_name, urlset_config)
+                            self.check_canonical_is_self_referencing(data, urlset_name, urlset_config)
+                            self.check_canonical_href_200(data, urlset_name, urlset_config)
+
+                            processed.add(data['_id'])
+
+                            if previous_extracted is not None:
+                                previous_extracted[str(data['url'])] = self.get_extracted(data)
+
+                        processed.flush()
+
+                    print("\n")
+
+    def get_extracted(self, data: dict) -> dict:
+        return Extractor.extracted(self.mongodb, HtmlParser.COLLECTION_NAME, data)
+
+    def get_previous_extracted(self, parsed_data: list, urlset_config: dict):
+        if not ('title' in urlset_config and 'has_title_changed' in urlset_config['title']) and \
+                not ('description' in urlset_config and 'has_description_changed' in urlset_config['description']):
+            return None
+
+        if 0 == len(parsed_data):
+            return {}
+
+        urls = {str(data['url']) for data in parsed_data}
+
+        return self.get_latest_extracted(
+            {
+                'url.protocol': {'$in': list({data['url'].protocol for data in parsed_data})},
+                'url.domain': {'$in': list({data['url'].domain for data in parsed_data})},
+                'url.path': {'$in': list({data['url'].path for data in parsed_data})},
+                'url.query': {'$in': list({data['url'].query for data in parsed_data})},
+                'processed_metatags': {'$exists': True},
+            },
+            lambda url: url in urls
+        )
+
+    def get_crawls_extracted(self, parsed_data: list, urlset_name: str, urlset_config: dict) -> dict:
+        duplicates_across_crawls = False
+
+        if 'duplicatesAcrossCrawls' in self.module_configuration.settings and \
+                type(self.module_configuration.settings['duplicatesAcrossCrawls']) is bool:
+            duplicates_across_crawls = self.module_configuration.settings['duplicatesAcrossCrawls']
+
+        if not duplicates_across_crawls:
+            return {}
+
+        if not ('title' in urlset_config and 'has_title_duplicates' in urlset_config['title']) and \
+                not ('description' in urlset_config and 'has_description_duplicates' in urlset_config['description']):
+            return {}
+
+        urls = {str(data['url']) for data in parsed_data}
+
+        return self.get_latest_extracted(
+            {
+                'urlset': urlset_name,
+                'processed_metatags': {'$exists': True},
+            },
+            lambda url: url not in urls
+        )
+
+    def get_latest_extracted(self, match: dict, accept_url) -> dict:
+        latest_extracted = {}
+
+        last_parsed_data = self.mongodb.aggregate(
+            HtmlParser.COLLECTION_NAME,
+            [
+                {'$match': match},
+                # sorted in the key order of the url_date index, so neither the sort nor the group have to block
+                {'$sort': {'url.protocol': 1, 'url.domain': 1, 'url.path': 1, 'url.query': 1, 'date': -1}},
+                {
+                    '$group': {
+                        '_id': {
+                            'protocol': '$url.protocol',
+                            'domain': '$url.domain',
+                            'path': '$url.path',
+                            'query': '$url.query',
+                        },
+                        'document_id': {'$first': '$_id'},
+                        'url': {'$first': '$url'},
+                        'extracted': {'$first': '$extracted'},
+                        'body_hash': {'$first': '$body_hash'},
+                    }
+                },
+            ]
+        )
+
+        for last_data in last_parsed_data:
+            url = str(last_data['url'])
+
+            if not accept_url(url):
+                continue
+
+            document = {'_id': last_data['document_id'], 'url': last_data['url']}
+
+            for key in ['extracted', 'body_hash']:
+                if key in last_data and last_data[key] is not None:
+                    document[key] = last_data[key]
+
+            if 'extracted' not in document and 'body_hash' not in document:
+                document = self.mongodb.find_one(HtmlParser.COLLECTION_NAME, {'_id': last_data['document_id']})
+
+                if document is None:
+                    continue
+
+            latest_extracted[url] = self.get_extracted(HtmlDocument(document, self.body_storage))
+
+        return latest_extracted
+
+    def check_duplicates(
+            self,
+            parsed_data: list,
+            urlset_name: str,
+            crawls_extracted: dict,
+            extracted_key: str,
+            check: str,
+            assert_val: bool,
+            error_message: str
+    ):
+        detector = DuplicateDetector()
+        latest_data = {}
+        values = {}
+
+        # a url crawled several times since the last run is only compared by its latest crawl
+        for data in sorted(parsed_data, key=lambda parsed: parsed.get('date') or datetime.min):
+            latest_data[str(data['url'])] = data
+
+        for url_str, data in latest_data.items():
+            texts = self.get_extracted(data)[extracted_key]
+
+            if len(texts) == 1 and texts[0] != '':
+                values[url_str] = texts[0]
+                detector.add(url_str, texts[0])
+
+        for url_str, extracted in crawls_extracted.items():
+            texts = extracted[extracted_key]
+
+            if len(texts) == 1 and texts[0] != '':
+                detector.add(url_str, texts[0])
+
+        for text, urls in detector.groups():
+            dup = len(urls) > 1
+
+            for url_str in urls:
+                if url_str not in values:
+                    continue
+
+                url = URL(url_str)
+                valid = dup == assert_val
+                diff = ''
+                error = ''
+
+                if dup:
+                    other_urls = [
+                        other_url for other_url in urls[:self.DUPLICATES_DIFF_LIMIT + 1] if other_url != url_str
+                    ]
+                    diff = ', '.join(other_urls[:self.DUPLICATES_DIFF_LIMIT])
+
+                    if len(urls) - 1 > self.DUPLICATES_DIFF_LIMIT:
+                        diff += ' (+' + str(len(urls) - 1 - self.DUPLICATES_DIFF_LIMIT) + ' more)'
+
+                    if not valid:
+                        error = error_message
+
+                self.check_service.add_check(
+                    self.module_configuration.database,
+                    urlset_name,
+                    check,
+                    str(values[url_str]),
+                    valid,
+                    diff,
+                    error,
+                    url.protocol,
+                    url.domain,
+                    url.path,
+                    url.query,
+                )
+
+    def resolve_canonical_statuses(self, parsed_data: list, urlset_name: str, urlset_config: dict):
+        if 'canonical' in urlset_config:
+            if 'canonical_href_200' in urlset_config['canonical']:
+                canonical_hrefs = []
+
+                for data in parsed_data:
+                    canonical_href = self.get_canonical_href(data, urlset_name, urlset_config)
+
+                    if canonical_href != '':
+                        canonical_hrefs.append(urljoin(str(data['url']), canonical_href))
+
+                self.status_cache.resolve(canonical_hrefs)
 
     # METATAG TITLE
 
     def get_metatitle(self, data: dict, urlset_name: str, urlset_config: dict):
         if 'title' in urlset_config:
-            doc = BeautifulSoup(data['body'], "html.parser")
-            titles = doc.find_all("title")
+            titles = self.get_extracted(data)['titles']
 
             problem_detected = {'multi': False, 'empty': False}
             if titles:
@@ -206,7 +435,7 @@ class Metatags:
 
                 print(' ... is title empty ' + str(valid))
 
-    def check_has_title_changed(self, data: dict, urlset_name: str, urlset_config: dict):
+    def check_has_title_changed(self, data: dict, urlset_name: str, urlset_config: dict, previous_extracted: dict):
         if 'title' in urlset_config:
             if 'has_title_changed' in urlset_config['title']:
                 assert_val = urlset_config['title']['has_title_changed']
@@ -221,22 +450,9 @@ class Metatags:
                         if title != '':
                             value_new = str(title)
 
-                last_parsed_data = self.mongodb.find_last_sorted(
-                    HtmlParser.COLLECTION_NAME,
-                    {
-                        'url.protocol': data['url'].protocol,
-                        'url.domain': data['url'].domain,
-                        'url.path': data['url'].path,
-                        'url.query': data['url'].query,
-                        'processed_metatags': {'$exists': True}
-                    },
-                    [('date', -1)]
-                )
-
                 value_last = ''
-                for last_data in last_parsed_data:
-
-                    titles_last = self.get_metatitle(last_data, urlset_name, urlset_config)
+                if str(data['url']) in previous_extracted:
+                    titles_last = previous_extracted[str(data['url'])]['titles']
 
                     if len(titles_last) == 1:
                         for title in titles_last:
@@ -274,114 +490,31 @@ class Metatags:
 
                 print(' ... has title changed ' + str(valid))
 
-    def check_has_title_duplicates(self, parsed_data: dict, urlset_name: str, urlset_config: dict):
+    def check_has_title_duplicates(
+            self,
+            parsed_data: list,
+            urlset_name: str,
+            urlset_config: dict,
+            crawls_extracted: dict
+    ):
         if 'title' in urlset_config:
             if 'has_title_duplicates' in urlset_config['title']:
-                assert_val = urlset_config['title']['has_title_duplicates']
-
-                valid = True
-
-                titles_dict = {}
-
-                for data in parsed_data:
-
-                    # dict_key = str(data['url'])
-
-                    doc = BeautifulSoup(data['body'], "html.parser")
-                    titles = doc.find_all("title")
-
-                    if len(titles) == 1:
-                        for title in titles:
-                            if title != '':
-                                titles_dict[str(data['url'])] = title
-
-                title_sorted = {}
-
-                # geeksforgeeks.org/python-find-keys-with-duplicate-values-in-dictionary/
-
-                for key, value in titles_dict.items():
-                    if value not in title_sorted:
-                        title_sorted[value] = [key]
-                    else:
-                        title_sorted[value].append(key)
-
-                title_duplicates = {}
-
-                for key_title, value_urls in title_sorted.items():
-                    if len(title_sorted[key_title]) > 1:
-                        title_duplicates[key_title] = value_urls
-                    elif len(title_sorted[key_title]) == 1:
-                        url = ''
-                        for url_str in value_urls:
-                            url = URL(url_str)
-                        valid = False
-                        dup = False
-                        if dup == assert_val:
-                            valid = True
-                        value = str(key_title)
-                        urlset = ''
-                        for data in parsed_data:
-                            urlset = data['urlset']
-
-                        self.check_service.add_check(
-                            self.module_configuration.database,
-                            urlset,
-                            'metatags-has_title_duplicates',
-                            value,
-                            valid,
-                            '',
-                            '',
-                            url.protocol,
-                            url.domain,
-                            url.path,
-                            url.query,
-                        )
-
-                for dup_title in title_duplicates:
-                    url = ''
-                    for problem_url in title_duplicates[dup_title]:
-                        url = URL(problem_url)
-                        valid = False
-                        dup = True
-                        if dup == assert_val:
-                            valid = True
-                        value = str(dup_title)
-                        diff = ''
-                        for other_url in title_duplicates[dup_title]:
-                            if other_url is not problem_url:
-                                if diff == '':
-                                    diff += other_url
-                                else:
-                                    diff += ', ' + other_url
-
-                        urlset = ''
-                        for data in parsed_data:
-                            urlset = data['urlset']
+                self.check_duplicates(
+                    parsed_data,
+                    urlset_name,
+                    crawls_extracted,
+                    'titles',
+                    'metatags-has_title_duplicates',
+                    urlset_config['title']['has_title_duplicates'],
+                    'title duplicates in url-set detected'
+                )
 
-                        error = ''
-                        if dup and not valid:
-                            error = 'title duplicates in url-set detected'
-
-                        self.check_service.add_check(
-                            self.module_configuration.database,
-                            urlset,
-                            'metatags-has_title_duplicates',
-                            value,
-                            valid,
-                            diff,
-                            error,
-                            url.protocol,
-                            url.domain,
-                            url.path,
-                            url.query,
-                        )
 
     # METATAG DESCRIPTION
 
     def get_metadescription(self, data: dict, urlset_name: str, urlset_config: dict):
         if 'description' in urlset_config:
-            doc = BeautifulSoup(data['body'], "html.parser")
-            metas = doc.find_all("meta", attrs={'name': 'description'})
+            metas = self.get_extracted(data)['descriptions']
 
             problem_detected = {'multi': False, 'empty': False}
             if metas:
@@ -440,7 +573,7 @@ class Metatags:
                 else:
                     value = ''
                     for meta in metas:
-                        metadescription = meta.get('content')
+                        metadescription = meta
                         if metadescription != '':
                             value = metadescription
                             exists = True
@@ -485,7 +618,7 @@ class Metatags:
                 else:
                     value = ''
                     for meta in metas:
-                        metadescription = meta.get('content')
+                        metadescription = meta
                         value = metadescription
                         if metadescription == '':
                             empty = True
@@ -514,7 +647,13 @@ class Metatags:
 
                     print(' ... ' + str(valid))
 
-    def check_has_description_changed(self, data: dict, urlset_name: str, urlset_config: dict):
+    def check_has_description_changed(
+            self,
+            data: dict,
+            urlset_name: str,
+            urlset_config: dict,
+            previous_extracted: dict
+    ):
         if 'description' in urlset_config:
             if 'has_description_changed' in urlset_config['description']:
                 assert_val = urlset_config['description']['has_description_changed']
@@ -529,22 +668,9 @@ class Metatags:
                         if description != '':
                             value_new = str(description)
 
-                last_parsed_data = self.mongodb.find_last_sorted(
-                    HtmlParser.COLLECTION_NAME,
-                    {
-                        'url.protocol': data['url'].protocol,
-                        'url.domain': data['url'].domain,
-                        'url.path': data['url'].path,
-                        'url.query': data['url'].query,
-                        'processed_metatags': {'$exists': True}
-                    },
-                    [('date', -1)]
-                )
-
                 value_last = ''
-                for last_data in last_parsed_data:
-
-                    descriptions_last = self.get_metadescription(last_data, urlset_name, urlset_config)
+                if str(data['url']) in previous_extracted:
+                    descriptions_last = previous_extracted[str(data['url'])]['descriptions']
 
                     if len(descriptions_last) == 1:
                         for description in descriptions_last:
@@ -582,119 +708,36 @@ class Metatags:
                     url.query,
                 )
 
-    def check_has_description_duplicates(self, parsed_data: dict, urlset_name: str, urlset_config: dict):
+    def check_has_description_duplicates(
+            self,
+            parsed_data: list,
+            urlset_name: str,
+            urlset_config: dict,
+            crawls_extracted: dict
+    ):
         if 'description' in urlset_config:
             if 'has_description_duplicates' in urlset_config['description']:
-                assert_val = urlset_config['description']['has_description_duplicates']
-
-                valid = True
-
-                descriptions_dict = {}
-
-                for data in parsed_data:
-
-                    # dict_key = str(data['url'])
-
-                    doc = BeautifulSoup(data['body'], "html.parser")
-                    descriptions = doc.find_all("meta", attrs={'name': 'description'})
-
-                    if len(descriptions) == 1:
-                        for description in descriptions:
-                            if description.get('content') != '':
-                                descriptions_dict[str(data['url'])] = description.get('content')
-
-                description_sorted = {}
-
-                # geeksforgeeks.org/python-find-keys-with-duplicate-values-in-dictionary/
-
-                for key, value in descriptions_dict.items():
-                    if value not in description_sorted:
-                        description_sorted[value] = [key]
-                    else:
-                        description_sorted[value].append(key)
-
-                description_duplicates = {}
-
-                for key_description, value_urls in description_sorted.items():
-                    if len(description_sorted[key_description]) > 1:
-                        description_duplicates[key_description] = value_urls
-                    elif len(description_sorted[key_description]) == 1:
-                        url = ''
-                        for url_str in value_urls:
-                            url = URL(url_str)
-                        valid = False
-                        dup = False
-                        if dup == assert_val:
-                            valid = True
-                        value = str(key_description)
-                        urlset = ''
-                        for data in parsed_data:
-                            urlset = data['urlset']
-
-                        self.check_service.add_check(
-                            self.module_configuration.database,
-                            urlset,
-                            'metatags-has_description_duplicates',
-                            value,
-                            valid,
-                            '',
-                            '',
-                            url.protocol,
-                            url.domain,
-                            url.path,
-                            url.query,
-                        )
-
-                for dup_description in description_duplicates:
-                    url = ''
-                    for problem_url in description_duplicates[dup_description]:
-                        url = URL(problem_url)
-                        valid = False
-                        dup = True
-                        if dup == assert_val:
-                            valid = True
-                        value = str(dup_description)
-                        diff = ''
-                        for other_url in description_duplicates[dup_description]:
-                            if other_url is not problem_url:
-                                if diff == '':
-                                    diff += other_url
-                                else:
-                                    diff += ', ' + other_url
-
-                        urlset = ''
-                        for data in parsed_data:
-                            urlset = data['urlset']
+                self.check_duplicates(
+                    parsed_data,
+                    urlset_name,
+                    crawls_extracted,
+                    'descriptions',
+                    'metatags-has_description_duplicates',
+                    urlset_config['description']['has_description_duplicates'],
+                    'description duplicates in url-set detected'
+                )
 
-                        error = ''
-                        if dup and not valid:
-                            error = 'description duplicates in url-set detected'
-
-                        self.check_service.add_check(
-                            self.module_configuration.database,
-                            urlset,
-                            'metatags-has_description_duplicates',
-                            value,
-                            valid,
-                            diff,
-                            error,
-                            url.protocol,
-                            url.domain,
-                            url.path,
-                            url.query,
-                        )
 
     # METATAG CANONICAL
 
     def get_canonical_href(self, data: dict, urlset_name: str, urlset_config: dict):
         if 'canonical' in urlset_config:
 
-            doc = BeautifulSoup(data['body'], "html.parser")
-            links = doc.find_all("link", rel='canonical')
+            links = self.get_extracted(data)['canonicals']
             href = ''
 
             for link in links:
-                href = link['href']
+                href = link
 
             return href
 
@@ -782,8 +825,7 @@ class Metatags:
                 canonical_href = self.get_canonical_href(data, urlset_name, urlset_config)
                 value = str(canonical_href)
                 if canonical_href != '':
-                    response = requests.get(canonical_href)
-                    if response.status_code == 200:
+                    if self.status_cache.status(urljoin(str(url), canonical_href)) == 200:
                         response_200 = True
                     else:
                         error = 'href in canonical not valid'
@@ -805,3 +847,10 @@ class Metatags:
                 )
 
                 print(' ... ' + str(valid))
+
+
+IndexRegistry.register(
+    HtmlParser.COLLECTION_NAME,
+    [('urlset', 1), ('processed_metatags', 1)],
+    'urlset_processed_metatags'
+)
@@ -1,4 +1,5 @@
 from database.connection import Connection
+from database.index_registry import IndexRegistry
 from service.check import Check
 from utilities.configuration import Configuration
 from utilities.url import URL
@@ -29,6 +30,12 @@ class Pagespeed:
                 {'processed_pagespeed': {'$exists': False}}
             )
 
+            processed = self.mongodb.acknowledger(
+                PagespeedAggregationModule.COLLECTION_NAME,
+                {'processed_pagespeed': True},
+                before_flush=self.check_service.flush
+            )
+
             for pagespeed_test in pagespeed_tests:
                 print(' + ' + str(pagespeed_test['url']))
 
@@ -137,11 +144,9 @@ class Pagespeed:
                 self.check_unminified_js(urlset_name, url, 'unminified_js', pagespeed_json_desktop, 'desktop')
                 self.check_unminified_js(urlset_name, url, 'unminified_js', pagespeed_json_mobile, 'mobile')
 
-                self.mongodb.update_one(
-                    PagespeedAggregationModule.COLLECTION_NAME,
-                    pagespeed_test['_id'],
-                    {'processed_pagespeed': True}
-                )
+                processed.add(pagespeed_test['_id'])
+
+            processed.flush()
 
             print("\n")
 
@@ -522,3 +527,6 @@ class Pagespeed:
             )
 
             print(' ... ' + str(valid))
+
+
+IndexRegistry.register(PagespeedAggregationModule.COLLECTION_NAME, [('processed_pagespeed', 1)], 'processed_pagespeed')
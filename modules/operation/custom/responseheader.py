@@ -38,6 +38,12 @@ class Responseheader:
 
                     urlset_config = urlset['checks']
 
+                    processed = self.mongodb.acknowledger(
+                        HtmlParser.COLLECTION_NAME,
+                        {'processed_responseheader': True},
+                        before_flush=self.check_service.flush
+                    )
+
                     for data in parsed_data:
                         print('   + ' + str(data['url']))
 
@@ -48,11 +54,9 @@ class Responseheader:
                         self.check_x_canonical(data, urlset_config)
                         self.check_no_index(data, urlset_config)
 
-                        self.mongodb.update_one(
-                            HtmlParser.COLLECTION_NAME,
-                            data['_id'],
-                            {'processed_responseheader': True}
-                        )
+                        processed.add(data['_id'])
+
+                    processed.flush()
 
                 print("\n")
 
@@ -1,4 +1,5 @@
 from database.connection import Connection
+from database.index_registry import IndexRegistry
 from modules.aggregation.custom.robotstxt import Robotstxt as AggregationRobotstxt
 from service.check import Check
 from utilities.configuration import Configuration
@@ -40,6 +41,12 @@ class Robotstxt:
 
                     urlset_config = urlset['checks']
 
+                    processed = self.mongodb.acknowledger(
+                        RobotstxtAggregationModule.COLLECTION_NAME,
+                        {'processed_robotstxt': True},
+                        before_flush=self.check_service.flush
+                    )
+
                     for url in self.configuration.urlsets.urlset_urls(urlset_name):
                         urlstr = str(url)
                         if not urlstr.endswith('/robots.txt'):
@@ -52,14 +59,12 @@ class Robotstxt:
                                 self.check_status_code(robotstxt, urlset_config)
                                 self.check_has_sitemap_xml(robotstxt, urlset_config)
 
-                                self.mongodb.update_one(
-                                    RobotstxtAggregationModule.COLLECTION_NAME,
-                                    robotstxt['_id'],
-                                    {'processed_robotstxt': True}
-                                )
+                                processed.add(robotstxt['_id'])
 
                             print("\n")
 
+                    processed.flush()
+
     def request_url_statuscode(self, url):
 
         try:
@@ -172,3 +177,10 @@ class Robotstxt:
                             url.path,
                             url.query,
                         )
+
+
+IndexRegistry.register(
+    RobotstxtAggregationModule.COLLECTION_NAME,
+    [('urlset', 1), ('processed_robotstxt', 1)],
+    'urlset_processed_robotstxt'
+)
@@ -2,6 +2,7 @@ from database.connection import Connection
 from utilities.configuration import Configuration
 from utilities.exceptions import ExitError
 from utilities.path import Path
+from os import environ
 import tocamelcase
 import importlib
 import pickle
@@ -15,7 +16,7 @@ def run(configuration_hash: str, configuration_key: str, module: str, module_nam
         raise ExitError('Could not unserialize configuration')
 
     custommodule = importlib.import_module('.' + module, package=module_namespace)
-    connection = Connection(configuration)
+    connection = Connection(configuration, '1' == environ.get('DATABASE_CONNECTION_POOL', '0'))
 
     for customattribute in dir(custommodule):
         if customattribute == tocamelcase.convert(module):
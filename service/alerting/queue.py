@@ -1,4 +1,5 @@
 from database import MongoDB
+from database.index_registry import IndexRegistry
 from datetime import datetime
 from typing import Sequence
 
@@ -60,3 +61,6 @@ class AlertQueue:
                 self._mongodb.delete_one(self.COLLECTION_ALERT_QUEUE, alert['_id'])
 
         return alerts
+
+
+IndexRegistry.register(AlertQueue.COLLECTION_ALERT_QUEUE, [('group', 1)], 'group')
@@ -1,5 +1,7 @@
+from service.api.search_console import QueryScheduler as SearchConsoleQueryScheduler
 from service.api.sistrix import Client as SistrixApiClient
 
 __all__ = [
+    'SearchConsoleQueryScheduler',
     'SistrixApiClient',
 ]
@@ -0,0 +1,93 @@
+from googleapiclient.discovery import Resource
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from threading import Lock, local
+from time import monotonic, sleep
+from typing import Callable, Hashable, Iterator
+
+
+class QueryScheduler:
+    ROW_LIMIT = 25000
+    DEFAULT_MAX_PARALLEL_REQUESTS = 4
+    DEFAULT_QUERIES_PER_SECOND = 10
+    DEFAULT_PREFETCH_PAGES = 2
+    DEFAULT_NUM_RETRIES = 3
+
+    def __init__(
+            self,
+            service_factory: Callable[[], Resource],
+            max_parallel_requests: int = DEFAULT_MAX_PARALLEL_REQUESTS,
+            queries_per_second: float = DEFAULT_QUERIES_PER_SECOND,
+            prefetch_pages: int = DEFAULT_PREFETCH_PAGES,
+            num_retries: int = DEFAULT_NUM_RETRIES,
+            row_limit: int = ROW_LIMIT
+    ):
+        self._service_factory = service_factory
+        self._max_parallel_requests = max(1, max_parallel_requests)
+        self._queries_per_second = queries_per_second
+        self._prefetch_pages = max(1, prefetch_pages)
+        self._num_retries = max(0, num_retries)
+        self._row_limit = row_limit
+        self._local = local()
+        self._throttle_lock = Lock()
+        self._next_query_time = 0.0
+
+    def query(self, site_url: str, requests: dict) -> Iterator[tuple]:
+        executor = ThreadPoolExecutor(max_workers=self._max_parallel_requests)
+        pending = {}
+        next_pages = {key: 0 for key in requests}
+        last_pages = {}
+
+        def submit(key: Hashable, until_page: int):
+            while next_pages[key] <= until_page and (key not in last_pages or next_pages[key] <= last_pages[key]):
+                future = executor.submit(self._fetch, site_url, requests[key], next_pages[key] * self._row_limit)
+                pending[future] = (key, next_pages[key])
+                next_pages[key] = next_pages[key] + 1
+
+        try:
+            for key in requests:
+                submit(key, self._prefetch_pages - 1)
+
+            while 0 < len(pending):
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    key, page = pending.pop(future)
+                    rows = future.result()
+
+                    if len(rows) < self._row_limit:
+                        last_pages[key] = min(page, last_pages.get(key, page))
+                    else:
+                        submit(key, page + self._prefetch_pages)
+
+                    yield key, page * self._row_limit, rows
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _fetch(self, site_url: str, request: dict, start_row: int) -> list:
+        self._throttle()
+
+        response = self._service().searchanalytics().query(
+            siteUrl=site_url,
+            body={**request, 'rowLimit': self._row_limit, 'startRow': start_row}
+        ).execute(num_retries=self._num_retries)
+
+        return response['rows'] if 'rows' in response else []
+
+    def _service(self) -> Resource:
+        # discovery resources share one http object, which must not be used by several threads
+        if not hasattr(self._local, 'service'):
+            self._local.service = self._service_factory()
+
+        return self._local.service
+
+    def _throttle(self):
+        if 0 >= self._queries_per_second:
+            return
+
+        with self._throttle_lock:
+            now = monotonic()
+            query_time = max(now, self._next_query_time)
+            self._next_query_time = query_time + 1 / self._queries_per_second
+
+        if query_time > now:
+            sleep(query_time - now)
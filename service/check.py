@@ -7,12 +7,16 @@ from utilities.exceptions import ConfigurationMissingError
 
 
 class Check:
-    def __init__(self, connection: Connection):
+    DEFAULT_BATCH_SIZE = 500
+
+    def __init__(self, connection: Connection, batch_size: int = DEFAULT_BATCH_SIZE):
         self._connection = connection
         self._orm = None
         self._bigquery = None
         self._urlset_checks_table = None
         self._urlset_urls_table = None
+        self._batch_size = max(1, batch_size)
+        self._buffer = []
 
         if connection.has_orm():
             self._orm = self._connection.orm
@@ -22,7 +26,8 @@ class Check:
         if connection.has_bigquery():
             self._bigquery = self._connection.bigquery
 
-        self._cached_url_ids = {}
+        if connection.has_orm() or connection.has_bigquery():
+            self._connection.register_close_callback(self.flush)
 
     def add_check(
             self,
@@ -47,11 +52,60 @@ class Check:
             if type(self._orm) is not ORM:
                 raise ConfigurationMissingError('Missing a orm connection')
 
-            url = url_protocol + '://' + url_domain + url_path + url_query
+            self._buffer.append({
+                'urlset': urlset,
+                'protocol': url_protocol,
+                'domain': url_domain,
+                'path': url_path,
+                'query': url_query,
+                'check': check,
+                'valid': valid,
+                'value': value,
+                'diff': diff,
+                'error': error,
+            })
+
+            if len(self._buffer) >= self._batch_size:
+                self.flush()
+
+    def flush(self):
+        if type(self._bigquery) is BigQuery:
+            self._bigquery.commit()
+
+        if 0 == len(self._buffer):
+            return
+
+        buffer = self._buffer
+        urlset_urls = {}
+        urlset_rows = {}
+
+        for row in buffer:
+            urlset_urls.setdefault(row['urlset'], set()).add(
+                (row['protocol'], row['domain'], row['path'], row['query'])
+            )
+
+        try:
+            with self._orm.begin():
+                url_ids = {
+                    urlset: self._urlset_urls_table.get_ids(urlset, list(urls))
+                    for urlset, urls in urlset_urls.items()
+                }
+
+                for row in buffer:
+                    urlset_rows.setdefault(row['urlset'], []).append({
+                        'url': url_ids[row['urlset']][(row['protocol'], row['domain'], row['path'], row['query'])],
+                        'check': row['check'],
+                        'valid': row['valid'],
+                        'value': row['value'],
+                        'diff': row['diff'],
+                        'error': row['error'],
+                    })
 
-            if url in self._cached_url_ids:
-                url_id = self._cached_url_ids[url]
-            else:
-                url_id = self._urlset_urls_table.add(urlset, url_protocol, url_domain, url_path, url_query)
+                for urlset, rows in urlset_rows.items():
+                    self._urlset_checks_table.add_many(urlset, rows)
+        except Exception:
+            # ids of urls inserted in the rolled back transaction must not be reused
+            self._urlset_urls_table.clear_cache()
+            raise
 
-            self._urlset_checks_table.add(urlset, url_id, check, valid, value, diff, error)
+        self._buffer = self._buffer[len(buffer):]
@@ -0,0 +1,10 @@
+from service.html.body_storage import BodyStorage, HtmlDocument
+from service.html.duplicate_detector import DuplicateDetector
+from service.html.extractor import Extractor
+
+__all__ = [
+    'BodyStorage',
+    'DuplicateDetector',
+    'Extractor',
+    'HtmlDocument',
+]
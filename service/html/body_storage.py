@@ -0,0 +1,88 @@
+from database.mongodb import MongoDB
+from pymongo import UpdateOne
+from datetime import datetime
+from hashlib import sha256
+from typing import Sequence
+import gzip
+
+
+class BodyStorage:
+    COLLECTION_NAME = 'html_parser_body'
+    RETENTION_INDEX_NAME = 'lastseen_ttl'
+    COMPRESSION_GZIP = 'gzip'
+    COMPRESSION_LEVEL = 6
+
+    def __init__(self, mongodb: MongoDB):
+        self._mongodb = mongodb
+
+    @staticmethod
+    def hash(body: str) -> str:
+        return sha256(body.encode('utf-8')).hexdigest()
+
+    def store_many(self, bodies: Sequence[str]) -> Sequence[str]:
+        now = datetime.utcnow()
+        body_hashes = [self.hash(body) for body in bodies]
+        collection = self._mongodb.get_collection(BodyStorage.COLLECTION_NAME)
+
+        existing_hashes = set(
+            document['_id'] for document in collection.find({'_id': {'$in': list(set(body_hashes))}}, {'_id': 1})
+        )
+
+        operations = {}
+
+        for body_hash, body in zip(body_hashes, bodies):
+            if body_hash in existing_hashes or body_hash in operations:
+                continue
+
+            operations[body_hash] = UpdateOne(
+                {'_id': body_hash},
+                {
+                    '$setOnInsert': {
+                        'body': gzip.compress(body.encode('utf-8'), compresslevel=BodyStorage.COMPRESSION_LEVEL),
+                        'compression': BodyStorage.COMPRESSION_GZIP,
+                        'size': len(body),
+                    },
+                    '$set': {'lastSeen': now},
+                },
+                upsert=True
+            )
+
+        if 0 < len(operations):
+            collection.bulk_write(list(operations.values()), ordered=False)
+
+        if 0 < len(existing_hashes):
+            collection.update_many({'_id': {'$in': list(existing_hashes)}}, {'$set': {'lastSeen': now}})
+
+        return body_hashes
+
+    def store(self, body: str) -> str:
+        return self.store_many([body])[0]
+
+    def load(self, body_hash: str) -> str:
+        document = self._mongodb.find_one(BodyStorage.COLLECTION_NAME, {'_id': body_hash}, True)
+
+        if document is None:
+            return ''
+
+        body = document['body']
+
+        if BodyStorage.COMPRESSION_GZIP == document.get('compression'):
+            body = gzip.decompress(body)
+
+        return body.decode('utf-8') if type(body) is bytes else body
+
+
+class HtmlDocument(dict):
+    def __init__(self, document: dict, body_storage: BodyStorage):
+        super().__init__(document)
+        self._body_storage = body_storage
+
+    def __missing__(self, key):
+        if 'body' == key and 'body_hash' in self:
+            body = self._body_storage.load(self['body_hash'])
+            self['body'] = body
+
+            return body
+
+        raise KeyError(key)
+
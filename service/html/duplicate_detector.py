@@ -0,0 +1,37 @@
+from hashlib import sha1
+from typing import Iterator
+
+
+class DuplicateDetector:
+    def __init__(self):
+        self._texts = {}
+        self._urls = {}
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return ' '.join(text.split()).casefold()
+
+    @staticmethod
+    def hash(text: str) -> str:
+        return sha1(DuplicateDetector.normalize(text).encode('utf-8')).hexdigest()
+
+    def add(self, url: str, text: str):
+        if text is None or '' == DuplicateDetector.normalize(text):
+            return
+
+        text_hash = DuplicateDetector.hash(text)
+
+        if text_hash not in self._urls:
+            self._texts[text_hash] = text
+            self._urls[text_hash] = []
+
+        self._urls[text_hash].append(url)
+
+    def groups(self) -> Iterator[tuple]:
+        for text_hash, urls in self._urls.items():
+            yield self._texts[text_hash], urls
+
+    def duplicates(self) -> Iterator[tuple]:
+        for text, urls in self.groups():
+            if len(urls) > 1:
+                yield text, urls
@@ -0,0 +1,89 @@
+from database.mongodb import MongoDB
+from html.parser import HTMLParser
+
+
+class _SummaryParser(HTMLParser):
+    HEADINGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.titles = []
+        self.descriptions = []
+        self.canonicals = []
+        self.robots = []
+        self.hreflangs = []
+        self.headings = {heading: 0 for heading in _SummaryParser.HEADINGS}
+        self._title = None
+
+    def handle_starttag(self, tag, attrs):
+        attributes = {name: value if value is not None else '' for name, value in attrs}
+
+        if 'title' == tag:
+            self._title = []
+        elif 'meta' == tag:
+            name = attributes.get('name', '').lower()
+
+            if 'description' == name:
+                self.descriptions.append(attributes.get('content', ''))
+            elif 'robots' == name:
+                self.robots.append(attributes.get('content', ''))
+        elif 'link' == tag:
+            rel = attributes.get('rel', '').lower().split()
+
+            if 'canonical' in rel:
+                self.canonicals.append(attributes.get('href', ''))
+
+            if 'alternate' in rel and 'hreflang' in attributes:
+                self.hreflangs.append({'hreflang': attributes['hreflang'], 'href': attributes.get('href', '')})
+        elif tag in self.headings:
+            self.headings[tag] += 1
+
+    def handle_endtag(self, tag):
+        if 'title' == tag:
+            self._close_title()
+
+    def handle_data(self, data):
+        if self._title is not None:
+            self._title.append(data)
+
+    def close(self):
+        super().close()
+        self._close_title()
+
+    def _close_title(self):
+        if self._title is not None:
+            self.titles.append(''.join(self._title).strip())
+            self._title = None
+
+
+class Extractor:
+    VERSION = 1
+
+    @staticmethod
+    def extract(body: str) -> dict:
+        parser = _SummaryParser()
+        parser.feed(body if type(body) is str else '')
+        parser.close()
+
+        return {
+            'version': Extractor.VERSION,
+            'titles': parser.titles,
+            'descriptions': parser.descriptions,
+            'canonicals': parser.canonicals,
+            'robots': parser.robots,
+            'hreflangs': parser.hreflangs,
+            'headings': parser.headings,
+        }
+
+    @staticmethod
+    def extracted(mongodb: MongoDB, collection_name: str, document: dict) -> dict:
+        if 'extracted' in document and type(document['extracted']) is dict and \
+                Extractor.VERSION == document['extracted'].get('version'):
+            return document['extracted']
+
+        document['extracted'] = Extractor.extract(document['body'])
+
+        if '_id' in document:
+            mongodb.update_one(collection_name, document['_id'], {'extracted': document['extracted']})
+
+        return document['extracted']
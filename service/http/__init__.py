@@ -0,0 +1,11 @@
+from service.http.fetcher import Fetcher
+from service.http.render_pool import RenderPool
+from service.http.status_cache import StatusCache
+from service.http.validator_store import ValidatorStore
+
+__all__ = [
+    'Fetcher',
+    'RenderPool',
+    'StatusCache',
+    'ValidatorStore',
+]
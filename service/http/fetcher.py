@@ -0,0 +1,100 @@
+from service.http.validator_store import ValidatorStore
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from http.cookiejar import DefaultCookiePolicy
+from requests import Session, Response
+from requests.adapters import HTTPAdapter
+from threading import BoundedSemaphore, Lock
+from typing import Callable, Iterable, Iterator
+from urllib.parse import urlparse
+
+
+class Fetcher:
+    DEFAULT_MAX_PARALLEL_REQUESTS = 20
+    DEFAULT_MAX_PARALLEL_REQUESTS_PER_HOST = 4
+    DEFAULT_TIMEOUT = 30
+
+    def __init__(
+            self,
+            max_parallel_requests: int = DEFAULT_MAX_PARALLEL_REQUESTS,
+            max_parallel_requests_per_host: int = DEFAULT_MAX_PARALLEL_REQUESTS_PER_HOST,
+            timeout: int = DEFAULT_TIMEOUT,
+            validator_store: ValidatorStore = None
+    ):
+        self._max_parallel_requests = max(1, max_parallel_requests)
+        self._max_parallel_requests_per_host = max(1, max_parallel_requests_per_host)
+        self._timeout = timeout
+        self._validator_store = validator_store
+        self._host_semaphores = {}
+        self._host_semaphores_lock = Lock()
+
+        # keep-alive connections are pooled per host, cookies must not leak between the fetched urls
+        adapter = HTTPAdapter(pool_connections=self._max_parallel_requests, pool_maxsize=self._max_parallel_requests)
+
+        self._session = Session()
+        self._session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._session.close()
+
+    def _host_semaphore(self, url: str) -> BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+
+        with self._host_semaphores_lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = BoundedSemaphore(self._max_parallel_requests_per_host)
+
+            return self._host_semaphores[host]
+
+    def get(self, url: str, headers: dict = None, **kwargs) -> Response:
+        if type(self._validator_store) is not ValidatorStore:
+            return self._get(url, headers, **kwargs)
+
+        validator = self._validator_store.find(url)
+        request_headers = dict(headers) if headers is not None else {}
+
+        if validator is not None:
+            request_headers.update(ValidatorStore.conditional_headers(validator))
+
+        response = self._get(url, request_headers, **kwargs)
+
+        if 304 == response.status_code and validator is not None:
+            return self._validator_store.restore(validator, response)
+
+        self._validator_store.save(url, response)
+
+        return response
+
+    def head(self, url: str, headers: dict = None, **kwargs) -> Response:
+        with self._host_semaphore(url):
+            return self._session.head(url, headers=headers, timeout=self._timeout, **kwargs)
+
+    def _get(self, url: str, headers: dict = None, **kwargs) -> Response:
+        with self._host_semaphore(url):
+            return self._session.get(url, headers=headers, timeout=self._timeout, **kwargs)
+
+    def process(self, function: Callable, arguments: Iterable[list]) -> Iterator:
+        pending = set()
+
+        with ThreadPoolExecutor(max_workers=self._max_parallel_requests) as executor:
+            for function_arguments in arguments:
+                pending.add(executor.submit(function, *function_arguments))
+
+                if len(pending) >= self._max_parallel_requests * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        yield future.result()
+
+            while 0 < len(pending):
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    yield future.result()
@@ -0,0 +1,89 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import WebDriverException
+from queue import Queue
+from typing import Callable
+
+
+class _PooledBrowser:
+    def __init__(self, driver: WebDriver):
+        self.driver = driver
+        self.rendered_pages = 0
+
+
+class RenderPool:
+    DEFAULT_SIZE = 2
+    DEFAULT_MAX_PAGES_PER_BROWSER = 100
+    DEFAULT_PAGE_LOAD_TIMEOUT = 30
+
+    def __init__(
+            self,
+            size: int = DEFAULT_SIZE,
+            max_pages_per_browser: int = DEFAULT_MAX_PAGES_PER_BROWSER,
+            page_load_timeout: int = DEFAULT_PAGE_LOAD_TIMEOUT,
+            driver_factory: Callable[[], WebDriver] = None
+    ):
+        self._max_pages_per_browser = max(1, max_pages_per_browser)
+        self._page_load_timeout = page_load_timeout
+        self._driver_factory = driver_factory if callable(driver_factory) else self._create_chrome_driver
+        self._browsers = Queue()
+
+        # browsers are started lazily, an empty slot is represented by None
+        for _ in range(max(1, size)):
+            self._browsers.put(None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        while not self._browsers.empty():
+            browser = self._browsers.get()
+
+            if type(browser) is _PooledBrowser:
+                self._quit(browser)
+
+    # Todo: refactor making things work with docker, see: "webdriver.Remote"
+    @staticmethod
+    def _create_chrome_driver() -> WebDriver:
+        chrome_options = Options()
+        chrome_options.add_argument('--headless')
+
+        return webdriver.Chrome(options=chrome_options)
+
+    @staticmethod
+    def _quit(browser: _PooledBrowser):
+        try:
+            browser.driver.quit()
+        except WebDriverException:
+            pass
+
+    def render(self, url: str) -> str:
+        browser = self._browsers.get()
+
+        try:
+            if browser is None:
+                browser = _PooledBrowser(self._driver_factory())
+                browser.driver.set_page_load_timeout(self._page_load_timeout)
+
+            browser.driver.delete_all_cookies()
+            browser.driver.get(url)
+            html = browser.driver.page_source
+            browser.rendered_pages += 1
+
+            if self._max_pages_per_browser <= browser.rendered_pages:
+                self._quit(browser)
+                browser = None
+        except WebDriverException:
+            if type(browser) is _PooledBrowser:
+                self._quit(browser)
+
+            browser = None
+            raise
+        finally:
+            self._browsers.put(browser)
+
+        return html
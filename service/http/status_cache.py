@@ -0,0 +1,61 @@
+from database.mongodb import MongoDB
+from database.index_registry import IndexRegistry
+from service.http.fetcher import Fetcher
+from requests.exceptions import RequestException
+from datetime import datetime, timedelta
+from typing import Iterable
+
+
+class StatusCache:
+    COLLECTION_NAME = 'http_status'
+    HEAD_NOT_SUPPORTED_STATUS_CODES = [405, 501]
+
+    def __init__(self, fetcher: Fetcher, mongodb: MongoDB = None, ttl: int = 0):
+        self._fetcher = fetcher
+        self._mongodb = mongodb if 0 < ttl else None
+        self._ttl = ttl
+        self._statuses = {}
+
+    def status(self, url: str):
+        if url not in self._statuses:
+            self.resolve([url])
+
+        return self._statuses[url]
+
+    def resolve(self, urls: Iterable[str]):
+        urls = {url for url in urls if url not in self._statuses}
+
+        if 0 == len(urls):
+            return
+
+        if self._mongodb is not None:
+            for document in self._mongodb.get_collection(StatusCache.COLLECTION_NAME).find(
+                    {'_id': {'$in': list(urls)}, 'expires': {'$gt': datetime.utcnow()}}
+            ):
+                self._statuses[document['_id']] = document['statusCode']
+                urls.discard(document['_id'])
+
+        for url, status_code in self._fetcher.process(self._fetch_status, [[url] for url in urls]):
+            self._statuses[url] = status_code
+
+            if self._mongodb is not None and status_code is not None:
+                self._mongodb.get_collection(StatusCache.COLLECTION_NAME).replace_one(
+                    {'_id': url},
+                    {'statusCode': status_code, 'expires': datetime.utcnow() + timedelta(seconds=self._ttl)},
+                    upsert=True
+                )
+
+    def _fetch_status(self, url: str) -> tuple:
+        try:
+            response = self._fetcher.head(url, allow_redirects=True)
+
+            if response.status_code in StatusCache.HEAD_NOT_SUPPORTED_STATUS_CODES:
+                response = self._fetcher.get(url, stream=True)
+                response.close()
+
+            return url, response.status_code
+        except RequestException:
+            return url, None
+
+
+IndexRegistry.register(StatusCache.COLLECTION_NAME, [('expires', 1)], 'expires_ttl', expire_after_seconds=0)
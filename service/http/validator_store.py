@@ -0,0 +1,77 @@
+from database.mongodb import MongoDB
+from database.index_registry import IndexRegistry
+from service.html import BodyStorage
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from datetime import datetime
+
+
+class ValidatorStore:
+    COLLECTION_NAME = 'http_validators'
+    VALIDATOR_TTL = 60 * 60 * 24 * 30
+
+    def __init__(self, mongodb: MongoDB, body_storage: BodyStorage = None):
+        self._mongodb = mongodb
+        self._body_storage = body_storage if type(body_storage) is BodyStorage else BodyStorage(mongodb)
+
+    def find(self, url: str):
+        return self._mongodb.get_collection(ValidatorStore.COLLECTION_NAME).find_one({'_id': url})
+
+    @staticmethod
+    def conditional_headers(validator: dict) -> dict:
+        headers = {}
+
+        if validator.get('etag') is not None:
+            headers['If-None-Match'] = validator['etag']
+
+        if validator.get('lastModified') is not None:
+            headers['If-Modified-Since'] = validator['lastModified']
+
+        return headers
+
+    def save(self, url: str, response: Response):
+        etag = response.headers.get('etag')
+        last_modified = response.headers.get('last-modified')
+
+        if 200 != response.status_code or (etag is None and last_modified is None):
+            return
+
+        try:
+            body = response.content.decode('utf-8')
+        except UnicodeDecodeError:
+            return
+
+        self._mongodb.get_collection(ValidatorStore.COLLECTION_NAME).replace_one(
+            {'_id': url},
+            {
+                'etag': etag,
+                'lastModified': last_modified,
+                'statusCode': response.status_code,
+                'headers': {key: value for key, value in response.headers.items()},
+                'bodyHash': self._body_storage.store(body),
+                'date': datetime.utcnow(),
+            },
+            upsert=True
+        )
+
+    def restore(self, validator: dict, not_modified_response: Response) -> Response:
+        response = Response()
+        response.status_code = validator['statusCode']
+        response.headers = CaseInsensitiveDict(validator['headers'])
+        response.headers.update(not_modified_response.headers)
+        response._content = self._body_storage.load(validator['bodyHash']).encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = not_modified_response.url
+        response.history = not_modified_response.history
+        response.elapsed = not_modified_response.elapsed
+        response.request = not_modified_response.request
+
+        return response
+
+
+IndexRegistry.register(
+    ValidatorStore.COLLECTION_NAME,
+    [('date', 1)],
+    'date_ttl',
+    expire_after_seconds=ValidatorStore.VALIDATOR_TTL
+)
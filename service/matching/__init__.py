@@ -0,0 +1,5 @@
+from service.matching.matching_engine import MatchingEngine
+
+__all__ = [
+    'MatchingEngine',
+]
@@ -0,0 +1,190 @@
+from pandas import DataFrame, Series, concat, isna
+from warnings import catch_warnings, filterwarnings
+from typing import Sequence
+import re
+
+
+def _contains(values: Series, pattern: re.Pattern) -> Series:
+    # only the mask is needed here, the groups are extracted for the matching rows afterwards
+    with catch_warnings():
+        filterwarnings('ignore', 'This pattern is interpreted as a regular expression', UserWarning)
+        return values.str.contains(pattern)
+
+
+class _RegexRule:
+    GROUP_REFERENCE_REGEX = re.compile(r'\$(\d+)')
+    GLOBAL_FLAGS_REGEX = re.compile(r'^(?:\(\?[aiLmsux]+\))*')
+
+    def __init__(self, pattern: re.Pattern, output: str):
+        self._pattern = pattern
+        self._output = output
+        self._parts = []
+        position = 0
+
+        for reference in _RegexRule.GROUP_REFERENCE_REGEX.finditer(output):
+            group = int(reference.group(1))
+
+            if group > pattern.groups:
+                continue
+
+            self._parts.append(output[position:reference.start()])
+            self._parts.append(group)
+            position = reference.end()
+
+        self._parts.append(output[position:])
+
+        if 0 in self._parts:
+            # global inline flags have to stay at the start of the wrapped pattern, their effect is in pattern.flags
+            global_flags = _RegexRule.GLOBAL_FLAGS_REGEX.match(pattern.pattern).group(0)
+            self._extract_pattern = re.compile('(' + pattern.pattern[len(global_flags):] + ')', pattern.flags)
+            self._group_offset = 0
+        else:
+            self._extract_pattern = pattern
+            self._group_offset = -1
+
+    def match(self, values: Series) -> Series:
+        matched = values[_contains(values, self._pattern)]
+
+        if 1 == len(self._parts) or matched.empty:
+            return Series(self._output, index=matched.index, dtype=object)
+
+        groups = matched.str.extract(self._extract_pattern, expand=True)
+        output = Series('', index=matched.index, dtype=object)
+
+        for part in self._parts:
+            if type(part) is int:
+                output = output + groups.iloc[:, part + self._group_offset].fillna('')
+            else:
+                output = output + part
+
+        return output
+
+
+class _RegexListRule:
+    def __init__(self, entries: Sequence[tuple], case_sensitive: bool):
+        flags = 0 if case_sensitive else re.IGNORECASE
+        self._entries = [(re.compile(keyword, flags), output) for keyword, output in reversed(entries)]
+
+    def match(self, values: Series) -> Series:
+        outputs = []
+
+        for pattern, output in self._entries:
+            if values.empty:
+                break
+
+            mask = _contains(values, pattern)
+            outputs.append(Series(output, index=values.index[mask], dtype=object))
+            values = values[~mask]
+
+        return concat(outputs) if 0 < len(outputs) else Series(dtype=object)
+
+
+class _KeywordRule:
+    def __init__(self, entries: Sequence[tuple], case_sensitive: bool):
+        self._case_sensitive = case_sensitive
+        self._outputs = {}
+        priorities = {}
+        trie = {}
+
+        for priority, (keyword, output) in enumerate(entries):
+            keyword = keyword if case_sensitive else keyword.lower()
+            priorities[keyword] = priority
+            self._outputs[priority] = output
+
+        for keyword in priorities:
+            node = trie
+
+            for character in keyword:
+                node = node.setdefault(character, {})
+
+            node[''] = keyword
+
+        # a keyword found at a position implies that all keywords which are a prefix of it were found as well
+        self._priorities = {}
+        self._collect_priorities(trie, priorities, -1)
+
+        self._pattern = re.compile(
+            '(?=(' + self._trie_pattern(trie) + '))',
+            0 if case_sensitive else re.IGNORECASE
+        )
+
+    def _collect_priorities(self, node: dict, priorities: dict, best_priority: int):
+        if '' in node:
+            best_priority = max(best_priority, priorities[node['']])
+            self._priorities[node['']] = best_priority
+
+        for character, child in node.items():
+            if '' != character:
+                self._collect_priorities(child, priorities, best_priority)
+
+    @staticmethod
+    def _trie_pattern(node: dict) -> str:
+        branches = [
+            re.escape(character) + _KeywordRule._trie_pattern(child)
+            for character, child in sorted(node.items()) if '' != character
+        ]
+
+        if 0 == len(branches):
+            return ''
+
+        pattern = branches[0] if 1 == len(branches) else '(?:' + '|'.join(branches) + ')'
+
+        return '(?:' + pattern + ')?' if '' in node else pattern
+
+    def match(self, values: Series) -> Series:
+        if 0 == len(self._priorities) or values.empty:
+            return Series(dtype=object)
+
+        found = values.str.extractall(self._pattern)[0]
+
+        if not self._case_sensitive:
+            found = found.str.lower()
+
+        return found.map(self._priorities).groupby(level=0).max().map(self._outputs)
+
+
+class MatchingEngine:
+    def __init__(self, expressions: Sequence[dict], fallback: str = ''):
+        self._fallback = fallback
+        self._rules = []
+
+        # every expression overwrites the ones before, so the rules are evaluated backwards and the first match wins
+        for expression in reversed(expressions):
+            if 'regex' in expression:
+                self._rules.append(_RegexRule(expression['regex'], expression['output']))
+            elif 'csv' in expression:
+                entries = self._csv_entries(expression['csv'])
+
+                if expression['useRegex']:
+                    self._rules.append(_RegexListRule(entries, expression['caseSensitive']))
+                else:
+                    self._rules.append(_KeywordRule(entries, expression['caseSensitive']))
+
+    @staticmethod
+    def _csv_entries(csv: DataFrame) -> list:
+        return [
+            (str(keyword), str(output_column))
+            for output_column in csv
+            for keyword in csv[output_column]
+            if not isna(keyword) and '' != str(keyword)
+        ]
+
+    def match(self, values: Series) -> Series:
+        values = values.astype(str)
+        result = Series(None, index=values.index, dtype=object)
+
+        for rule in self._rules:
+            remaining = values[result.isna()]
+
+            if remaining.empty:
+                break
+
+            matched = rule.match(remaining).dropna()
+            result.loc[matched.index] = matched
+
+        result = result.fillna('')
+
+        if 0 < len(self._fallback):
+            result = result.replace('', self._fallback)
+
+        return result
@@ -66,12 +66,16 @@ class ConfigurationBigQueryDataset:
 
 
 class ConfigurationBigQuery:
+    DEFAULT_METADATA_CACHE_TTL = 300
+
     def __init__(
             self,
             project: str,
             dataset: ConfigurationBigQueryDataset,
             additional_datasets: Dict[str, ConfigurationBigQueryDataset] = None,
-            credentials: str = None
+            credentials: str = None,
+            metadata_cache_ttl: int = DEFAULT_METADATA_CACHE_TTL,
+            metadata_cache_redis: str = None
     ):
         if additional_datasets is None:
             additional_datasets = {}
@@ -80,6 +84,8 @@ class ConfigurationBigQuery:
         self.dataset = dataset
         self.credentials = credentials
         self.additional_datasets = additional_datasets
+        self.metadata_cache_ttl = metadata_cache_ttl
+        self.metadata_cache_redis = metadata_cache_redis
 
 
 class ConfigurationDatabases:
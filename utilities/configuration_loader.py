@@ -245,6 +245,8 @@ class ConfigurationLoader:
         key = 'databases'
         additional_datasets = {}
         credentials = None
+        metadata_cache_ttl = ConfigurationBigQuery.DEFAULT_METADATA_CACHE_TTL
+        metadata_cache_redis = None
 
         if 'bigquery' in plain_configuration[key] and type(plain_configuration[key]['bigquery']) is dict:
             if 'project' not in plain_configuration[key]['bigquery']:
@@ -274,7 +276,22 @@ class ConfigurationLoader:
             if 'credentials' in plain_configuration[key]['bigquery']:
                 credentials = abspath(plain_configuration[key]['bigquery']['credentials'])
 
-            return ConfigurationBigQuery(project, dataset, additional_datasets, credentials)
+            if 'metadataCacheTtl' in plain_configuration[key]['bigquery'] and \
+                    type(plain_configuration[key]['bigquery']['metadataCacheTtl']) is int:
+                metadata_cache_ttl = plain_configuration[key]['bigquery']['metadataCacheTtl']
+
+            if 'metadataCacheRedis' in plain_configuration[key]['bigquery'] and \
+                    type(plain_configuration[key]['bigquery']['metadataCacheRedis']) is str:
+                metadata_cache_redis = plain_configuration[key]['bigquery']['metadataCacheRedis']
+
+            return ConfigurationBigQuery(
+                project,
+                dataset,
+                additional_datasets,
+                credentials,
+                metadata_cache_ttl,
+                metadata_cache_redis
+            )
         else:
             raise ConfigurationMissingError(key + ' -> bigquery')
 